@@ -1,22 +1,30 @@
 import streamlit as st
 import streamlit.components.v1 as components
-import pandas as pd
-import altair as alt
 import re
+import time
 
 from auth import signup, login
 from backend import (
     generate_questions,
     get_scores,
-    store_text_as_json,
-    chunk_text,
-    call_groq
+    get_scores_batch,
+    submit_scoring_job,
+    collect_scoring_jobs,
+    resume_engine
 )
 
-from pdf_utils import generate_pdf
-from ocr_utils import extract_text_from_resume
+from session_store import (
+    start_interview,
+    save_answer,
+    save_score,
+    load_active_interview
+)
+from ocr_utils import UploadSpool
+from metrics import start_exporters
 
 
+# File / HTTP metrics export when METRICS_ENABLED=1; no-op after the first run
+start_exporters()
 
 st.set_page_config(
     page_title="AI Interview Coach",
@@ -27,6 +35,8 @@ st.set_page_config(
 
 defaults = {
     "logged_in": False,
+    "username": None,
+    "interview_id": None,
     "questions": [],
     "current_q": 0,
     "started": False,
@@ -35,12 +45,52 @@ defaults = {
     "feedbacks": [],
     "scores": [],
     "candidate_name": "Candidate",
-    "dark_mode": False
+    "dark_mode": False,
+    "scoring_mode": "Background",
+    "pending_scores": [],
+    "score_jobs": {}
 }
 for k, v in defaults.items():
     st.session_state.setdefault(k, v)
 
 
+def upload_spool():
+    """This session's scratch dir for large uploads; removed when the session ends"""
+    if "upload_spool" not in st.session_state:
+        st.session_state.upload_spool = UploadSpool()
+    return st.session_state.upload_spool
+
+
+def persist_score(i, r):
+    """Save a finished score for the current interview"""
+    if st.session_state.interview_id is not None:
+        save_score(st.session_state.interview_id, i, r["score"], r["feedback"])
+
+
+def persist_new_interview():
+    """Save freshly generated questions as a new interview"""
+    st.session_state.interview_id = start_interview(
+        st.session_state.username,
+        st.session_state.get("role", "Unknown Role"),
+        st.session_state.get("round_type", "Resume"),
+        st.session_state.questions
+    )
+
+
+def restore_interview(saved):
+    """Put a saved interview back into session_state"""
+    for k in ("interview_id", "role", "round_type", "questions", "answers",
+              "scores", "feedbacks", "current_q", "completed"):
+        st.session_state[k] = saved[k]
+    st.session_state.started = True
+    st.session_state.pending_scores = []
+    # Answers whose scoring was lost (e.g. worker restart) are scored again
+    st.session_state.score_jobs = {
+        i: submit_scoring_job(saved["questions"][i], saved["answers"][i])
+        for i in saved["unscored"]
+    }
+
+
 st.markdown("""
 <style>
 .stApp {
@@ -136,6 +186,12 @@ if not st.session_state.logged_in:
     if mode == "Login" and st.button("Login"):
         if login(user, pwd):
             st.session_state.logged_in = True
+            st.session_state.username = user
+
+            # Pick up where the candidate left off
+            saved = load_active_interview(user)
+            if saved:
+                restore_interview(saved)
             st.rerun()
         else:
             st.error("Invalid credentials")
@@ -171,56 +227,52 @@ with st.sidebar:
     uploaded = st.file_uploader("📄 Upload Resume", type=["pdf", "jpg", "png"])
 
     if uploaded:
-        path = f"uploaded_{uploaded.name}"
-
-        with open(path, "wb") as f:
-            f.write(uploaded.getbuffer())
-
         st.success("Resume uploaded ✅")
 
         # ✅ Generate questions button ALSO in sidebar
         if st.button("✨ Generate Resume Questions"):
-            with st.spinner("OCR → JSON → Chunking → Model..."):
-
-                resume_text = extract_text_from_resume(path)
-                doc_id = store_text_as_json(resume_text)
-                chunks = chunk_text(resume_text)
-
-                questions = []
-                for chunk in chunks[:3]:
-                    prompt = f"""
-                    This is part of candidate resume:
-                    {chunk}
-
-                    Generate interview questions.
-                    One per line. No numbering.
-                    """
-                    resp = call_groq(prompt)
-                    qs = [q.strip() for q in resp.split("\n") if q.strip()]
-                    questions.extend(qs)
-
-                    if len(questions) >= 5:
-                        break
-
-                questions = list(dict.fromkeys(questions))[:5]
-
-            st.session_state.questions = questions
-            n = len(questions)
-
-            st.session_state.started = True
-            st.session_state.current_q = 0
-            st.session_state.completed = False
-            st.session_state.answers = [""] * n
-            st.session_state.feedbacks = [""] * n
-            st.session_state.scores = [0] * n
-
-            st.rerun()
+            questions, error = [], None
+            with st.spinner("Extract → Normalize → Chunk → Generate → Dedupe..."):
+                try:
+                    questions = resume_engine.run(
+                        uploaded, uploaded.name, spool=upload_spool()
+                    )["questions"]
+                except ValueError as e:
+                    error = f"❌ {e}"
+
+            if questions:
+                st.session_state.questions = questions
+                n = len(questions)
+
+                st.session_state.started = True
+                st.session_state.current_q = 0
+                st.session_state.completed = False
+                st.session_state.answers = [""] * n
+                st.session_state.feedbacks = [""] * n
+                st.session_state.scores = [0] * n
+                st.session_state.pending_scores = []
+                st.session_state.score_jobs = {}
+                persist_new_interview()
+
+                st.rerun()
+            else:
+                st.error(error or "❌ Could not generate questions from this resume. Please try again.")
 
     st.divider()
 
     # Dark mode
     st.session_state.dark_mode = st.toggle("🌙 Dark Mode")
 
+    # Background: score while the next question is shown
+    # After each answer: wait for the score before moving on
+    # At the end: score all answers in one batch when the interview completes
+    scoring_modes = ["Background", "After each answer", "At the end"]
+    st.session_state.scoring_mode = st.selectbox(
+        "⏱️ Scoring",
+        scoring_modes,
+        index=scoring_modes.index(st.session_state.scoring_mode)
+    )
+
     # Logout
     if st.button("🚪 Logout"):
         st.session_state.clear()
@@ -247,19 +299,33 @@ if not st.session_state.started:
         if st.button("🚀 Start Interview"):
             st.session_state.role = role_input 
             st.session_state.round_type = round_type_input
-            st.session_state.questions = generate_questions(role_input, round_type_input)[:5]
+            preview = st.empty()
+            st.session_state.questions = generate_questions(
+                role_input, round_type_input, on_token=preview.info
+            )[:5]
             n = len(st.session_state.questions)
             st.session_state.started = True
             st.session_state.current_q = 0
             st.session_state.answers = [""]*n
             st.session_state.feedbacks = [""]*n
             st.session_state.scores = [0]*n
+            st.session_state.pending_scores = []
+            st.session_state.score_jobs = {}
+            persist_new_interview()
             st.rerun()
 
 
 
 if st.session_state.started and not st.session_state.completed:
 
+    # Save any background scores that finished since the last rerun
+    collect_scoring_jobs(
+        st.session_state.score_jobs,
+        st.session_state.scores,
+        st.session_state.feedbacks,
+        persist_score
+    )
+
     i = st.session_state.current_q
     total = len(st.session_state.questions)
 
@@ -281,17 +347,39 @@ if st.session_state.started and not st.session_state.completed:
         submitted = st.form_submit_button("Submit Answer")
 
         if submitted and ans.strip():
-            r = get_scores(st.session_state.questions[i], ans)
-
             st.session_state.answers[i] = ans
-            st.session_state.scores[i] = r["score"]
-            st.session_state.feedbacks[i] = r["feedback"]
+
+            mode = st.session_state.scoring_mode
+            if mode == "Background":
+                st.session_state.score_jobs[i] = submit_scoring_job(
+                    st.session_state.questions[i], ans
+                )
+            elif mode == "At the end":
+                st.session_state.pending_scores.append(i)
+            else:
+                live_feedback = st.empty()
+                r = get_scores(
+                    st.session_state.questions[i], ans, on_feedback=live_feedback.info
+                )
+                st.session_state.scores[i] = r["score"]
+                st.session_state.feedbacks[i] = r["feedback"]
 
             st.session_state.current_q += 1
 
             if st.session_state.current_q >= total:
                 st.session_state.completed = True
 
+            if st.session_state.interview_id is not None:
+                save_answer(
+                    st.session_state.interview_id,
+                    i,
+                    ans,
+                    st.session_state.current_q,
+                    st.session_state.completed
+                )
+                if mode == "After each answer":
+                    persist_score(i, r)
+
             st.rerun()
 
 
@@ -299,6 +387,31 @@ if st.session_state.completed:
 
     st.success("🎉 Interview Completed!")
 
+    # Deferred answers are scored together in as few requests as possible
+    pending = st.session_state.get("pending_scores", [])
+    if pending:
+        with st.spinner("Scoring your answers..."):
+            results = get_scores_batch([
+                (st.session_state.questions[i], st.session_state.answers[i])
+                for i in pending
+            ])
+        for i, r in zip(pending, results):
+            st.session_state.scores[i] = r["score"]
+            st.session_state.feedbacks[i] = r["feedback"]
+            persist_score(i, r)
+        st.session_state.pending_scores = []
+
+    # Background jobs: show per-question status until every score is in
+    jobs = st.session_state.score_jobs
+    if collect_scoring_jobs(jobs, st.session_state.scores, st.session_state.feedbacks, persist_score):
+        total = len(st.session_state.questions)
+        st.info(f"⏳ Scoring answers... {total - len(jobs)} of {total} done")
+        for i, q in enumerate(st.session_state.questions):
+            status = "⏳ Pending" if i in jobs else f"✅ {st.session_state.scores[i]} / 10"
+            st.markdown(f"**Q{i+1}:** {q} — {status}")
+        time.sleep(1)
+        st.rerun()
+
     role = st.session_state.get("role", "Unknown Role")
     round_type = st.session_state.get("round_type", "Unknown Round")
 
@@ -314,6 +427,11 @@ if st.session_state.completed:
         st.stop()
 
     # ---------------- CHART ----------------
+    # Charting and PDF libraries are only needed on this page
+    import pandas as pd
+    import altair as alt
+    from pdf_utils import render_pdf
+
     df = pd.DataFrame({
         "Question": [f"Q{i+1}" for i in range(total)],
         "Score": scores
@@ -369,7 +487,8 @@ if st.session_state.completed:
 
     # ---------------- PDF ----------------
     if st.button("📄 Generate PDF Report"):
-        pdf_path = generate_pdf(
+        # Rendered in memory: no shared file for concurrent users to clobber
+        pdf_bytes = render_pdf(
             role,
             round_type,
             questions,
@@ -379,9 +498,9 @@ if st.session_state.completed:
             avg_score
         )
 
-        with open(pdf_path, "rb") as f:
-            st.download_button(
-                "⬇️ Download PDF",
-                f,
-                file_name="Interview_Report.pdf"
-            )
+        st.download_button(
+            "⬇️ Download PDF",
+            pdf_bytes,
+            file_name="Interview_Report.pdf",
+            mime="application/pdf"
+        )
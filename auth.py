@@ -1,48 +1,187 @@
+import os
+import hmac
+import base64
+import asyncio
 import sqlite3
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 
-def get_db():
-    return sqlite3.connect("users.db")
-
-def create_table():
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE,
-            password TEXT
+from db import get_pool
+
+# Fixed SQL strings so each pooled connection compiles them only once
+INSERT_USER = "INSERT INTO users (username, password) VALUES (?, ?)"
+SELECT_USER = "SELECT id, password FROM users WHERE username=?"
+UPDATE_PASSWORD = "UPDATE users SET password=? WHERE id=?"
+
+# ---------------- PASSWORD HASHING ----------------
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "scrypt")
+SCRYPT_N = int(os.getenv("SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.getenv("SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("SCRYPT_P", "1"))
+PBKDF2_ITERATIONS = int(os.getenv("PBKDF2_ITERATIONS", "600000"))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode().rstrip("=")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+class ScryptHasher:
+    """scrypt$n$r$p$salt$hash"""
+
+    algorithm = "scrypt"
+
+    def __init__(self, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+        self.n, self.r, self.p = n, r, p
+
+    @classmethod
+    def from_encoded(cls, encoded):
+        _, n, r, p, _, _ = encoded.split("$")
+        return cls(int(n), int(r), int(p))
+
+    def _derive(self, password, salt):
+        return hashlib.scrypt(
+            password.encode(), salt=salt, n=self.n, r=self.r, p=self.p,
+            maxmem=256 * self.n * self.r * self.p, dklen=32,
         )
-    """)
-    conn.commit()
-    conn.close()
+
+    def hash(self, password):
+        salt = os.urandom(16)
+        digest = self._derive(password, salt)
+        return f"scrypt${self.n}${self.r}${self.p}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, encoded):
+        *_, salt, digest = encoded.split("$")
+        return hmac.compare_digest(self._derive(password, _unb64(salt)), _unb64(digest))
+
+    def params(self):
+        return (self.n, self.r, self.p)
+
+
+class PBKDF2Hasher:
+    """pbkdf2_sha256$iterations$salt$hash"""
+
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations=PBKDF2_ITERATIONS):
+        self.iterations = iterations
+
+    @classmethod
+    def from_encoded(cls, encoded):
+        return cls(int(encoded.split("$")[1]))
+
+    def _derive(self, password, salt):
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.iterations)
+
+    def hash(self, password):
+        salt = os.urandom(16)
+        digest = self._derive(password, salt)
+        return f"pbkdf2_sha256${self.iterations}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, encoded):
+        *_, salt, digest = encoded.split("$")
+        return hmac.compare_digest(self._derive(password, _unb64(salt)), _unb64(digest))
+
+    def params(self):
+        return (self.iterations,)
+
+
+class LegacySHA256Hasher:
+    """Unsalted SHA-256 hex from older accounts; verify-only"""
+
+    algorithm = "sha256"
+
+    @classmethod
+    def from_encoded(cls, encoded):
+        return cls()
+
+    def hash(self, password):
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def verify(self, password, encoded):
+        return hmac.compare_digest(self.hash(password), encoded)
+
+    def params(self):
+        return ()
+
+
+HASHERS = {h.algorithm: h for h in (ScryptHasher, PBKDF2Hasher, LegacySHA256Hasher)}
+
+
+def get_hasher():
+    """Hasher for new passwords, as configured by PASSWORD_HASHER"""
+    return HASHERS[PASSWORD_HASHER]()
+
+
+def identify_hasher(encoded):
+    """Hasher (with the stored parameters) that produced `encoded`"""
+    algorithm = encoded.split("$", 1)[0] if "$" in encoded else "sha256"
+    return HASHERS[algorithm].from_encoded(encoded)
+
 
 def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+    return get_hasher().hash(password)
 
-def signup(username, password):
-    create_table()
+
+def verify_password(password, encoded):
+    """
+    Returns (matches, needs_rehash). needs_rehash is True when the stored
+    hash uses another algorithm or other cost parameters than configured.
+    """
+    stored = identify_hasher(encoded)
+    if not stored.verify(password, encoded):
+        return False, False
+    current = get_hasher()
+    return True, (stored.algorithm, stored.params()) != (current.algorithm, current.params())
+
+
+# KDF work runs here: caps CPU spent on hashing and keeps callers' threads free
+_hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="kdf")
+
+
+def get_db():
+    """Borrow a pooled connection (use as a context manager)"""
+    return get_pool().connection()
+
+def _create_user(username, password):
+    hashed = hash_password(password)
     try:
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO users (username, password) VALUES (?, ?)",
-            (username, hash_password(password))
-        )
-        conn.commit()
-        conn.close()
+        with get_db() as conn:
+            conn.execute(INSERT_USER, (username, hashed))
         return True
-    except:
+    except sqlite3.IntegrityError:
         return False
 
+def signup(username, password):
+    return _hash_pool.submit(_create_user, username, password).result()
+
+def _check_login(username, password):
+    with get_db() as conn:
+        user = conn.execute(SELECT_USER, (username,)).fetchone()
+    if user is None:
+        return False
+
+    user_id, stored = user
+    ok, needs_rehash = verify_password(password, stored)
+    if ok and needs_rehash:
+        # Upgrade old or outdated hashes transparently on successful login
+        with get_db() as conn:
+            conn.execute(UPDATE_PASSWORD, (hash_password(password), user_id))
+    return ok
+
 def login(username, password):
-    create_table()
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT * FROM users WHERE username=? AND password=?",
-        (username, hash_password(password))
-    )
-    user = cur.fetchone()
-    conn.close()
-    return user is not None
\ No newline at end of file
+    return _hash_pool.submit(_check_login, username, password).result()
+
+async def login_async(username, password):
+    """login() for asyncio callers; the KDF never runs on the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, _check_login, username, password)
+
+async def signup_async(username, password):
+    """signup() for asyncio callers; the KDF never runs on the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, _create_user, username, password)
@@ -1,57 +1,83 @@
 import os
-import json
-from dotenv import load_dotenv
-from groq import Groq
-import streamlit as st
-from PIL import Image
-import pytesseract
-from pdfminer.high_level import extract_text
-from uuid import uuid4
-
-# ---------------- OCR UTILS ----------------
-# Define OCR function here to avoid import issues
+import time
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from document_store import DocumentStore
+from question_bank import get_bank
+from dedup_utils import dedupe_questions
+from resume_chunker import iter_chunks, select_chunks, normalize_text
+from json_utils import JSONStreamParser, extract_json
+from cache_utils import question_cache, prompt_key
+from ocr_utils import read_resume, SUPPORTED_EXTENSIONS
+from llm_client import LLM_BACKEND, get_llm_client
+from metrics import instrument, timed_stream, observe, cache_result, inc
+
 # ---------------- TEMP TEXT LIBRARY ----------------
-temp_text_library = {}
+# Resume documents are only needed while questions are generated.
+# The store is bounded (LRU + byte budget, spilling to disk) and a
+# background sweeper drops documents after DOCUMENT_TTL seconds.
+DOCUMENT_SWEEP_INTERVAL = int(os.getenv("DOCUMENT_SWEEP_INTERVAL", "60"))
+
+temp_text_library = DocumentStore()
 
 def store_text_as_json(text: str) -> str:
     """Store extracted text as JSON in temporary library"""
-    doc_id = str(uuid4())
-    temp_text_library[doc_id] = {
-        "content": text
-    }
-    return doc_id
+    return temp_text_library.put(text)
+
+
+def get_stored_text(doc_id: str) -> str:
+    """Text stored by store_text_as_json ("" once expired)"""
+    return temp_text_library.get(doc_id) or ""
+
+
+def _sweep_forever():
+    while True:
+        time.sleep(DOCUMENT_SWEEP_INTERVAL)
+        temp_text_library.sweep()
+
+
+threading.Thread(target=_sweep_forever, name="doc-sweeper", daemon=True).start()
 
 
 def chunk_text(text: str, chunk_size: int = 200):
-    """Split text into chunks of approx N words"""
-    words = text.split()
-    chunks = [
-        " ".join(words[i:i + chunk_size])
-        for i in range(0, len(words), chunk_size)
-    ]
-    return chunks
+    """Split text into section-aware chunks of at most chunk_size tokens"""
+    return [c["text"] for c in iter_chunks(text, max_tokens=chunk_size)]
 
-pytesseract.pytesseract.tesseract_cmd = r"D:\Tesseract-OCR\tesseract.exe"
 
-def extract_text_from_image(image_path):
-    """Extract text from an image using pytesseract."""
-    try:
-        image = Image.open(image_path)
-        text = pytesseract.image_to_string(image)
-        return text
-    except Exception as e:
-        print("Error in OCR:", e)
-        return ""
+def select_resume_chunks(text: str, k: int = 3, chunk_size: int = 200):
+    """The k most informative chunks of a resume, in document order"""
+    return select_chunks(text, k=k, max_tokens=chunk_size)
 
 
 # ---------------- ENV & API ----------------
-load_dotenv()
-API_KEY = os.getenv("GROQ_API_KEY")
-if not API_KEY:
-    raise ValueError("❌ GROQ_API_KEY missing in .env")
+_llm = None
+
+
+def get_llm():
+    """
+    The shared LLM client (pooled connections, rate limit, retries,
+    breaker). .env is read and the client built on the first call, so
+    importing this module never needs the groq package or an API key.
+    """
+    global _llm
+    if _llm is None:
+        from dotenv import load_dotenv
+        load_dotenv()
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key and LLM_BACKEND != "fake":
+            raise ValueError("❌ GROQ_API_KEY missing in .env")
+        _llm = get_llm_client(api_key)
+    return _llm
+
 
-client = Groq(api_key=API_KEY)
 MODEL = "llama-3.1-8b-instant"
+TEMPERATURE = 0.3
+
+# Serve questions from the cached pool once it holds this many per prompt
+QUESTION_POOL_SIZE = int(os.getenv("QUESTION_POOL_SIZE", "15"))
 
 SYSTEM_PROMPT = """
 You are an AI Interview Coach.
@@ -69,90 +95,391 @@ If the user asks anything else, reply only:
 
 
 # ---------------- GROQ CALL ----------------
-def call_groq(prompt: str) -> str:
+@instrument("call_groq")
+def call_groq(prompt: str, max_tokens: int = 400) -> str:
     """Call Groq LLM and return text response."""
-    response = client.chat.completions.create(
+    return get_llm().complete(
         model=MODEL,
         messages=[
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ],
-        temperature=0.3,
-        max_tokens=400
+        temperature=TEMPERATURE,
+        max_tokens=max_tokens
     )
-    return response.choices[0].message.content.strip()
+
+
+def call_groq_stream(prompt: str, max_tokens: int = 400):
+    """Like call_groq, but yields text tokens as the model produces them."""
+    tokens = get_llm().stream(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=TEMPERATURE,
+        max_tokens=max_tokens
+    )
+    return timed_stream("call_groq_stream", tokens)
+
+
+# ---------------- CONCURRENT FAN-OUT ----------------
+FANOUT_WORKERS = int(os.getenv("FANOUT_WORKERS", "3"))
+
+
+def split_questions(text: str):
+    """One question per non-empty line"""
+    return [q.strip() for q in text.split("\n") if q.strip()]
+
+
+def _chunk_questions(future, i):
+    try:
+        return split_questions(future.result())
+    except Exception as e:
+        print("⚠️ Question generation failed for chunk", i, ":", e)
+        return []
+
+
+def _merge_results(results):
+    """Questions of every finished chunk, in chunk order, near-duplicates dropped"""
+    return dedupe_questions([q for r in results if r is not None for q in r])
+
+
+def _finish_in_background(futures, results, on_complete):
+    """Wait for the chunks still running, then pass everything to on_complete"""
+    for future, i in futures.items():
+        results[i] = _chunk_questions(future, i)
+    try:
+        on_complete(_merge_results(results))
+    except Exception as e:
+        print("⚠️ Background question fill failed:", e)
+
+
+def fan_out_questions(prompts, limit: int = 5, max_workers: int = FANOUT_WORKERS,
+                      on_complete=None):
+    """
+    Send all prompts to Groq at once (at most max_workers in flight).
+    Answers are merged in prompt order and near-duplicates dropped; as
+    soon as the finished prefix holds `limit` distinct questions they are
+    returned. limit=None waits for every answer.
+
+    Without on_complete the unfinished requests are cancelled. With it
+    they keep running, and on_complete(all questions) is called once
+    every answer is in, from a background thread if returning early.
+    """
+    results = [None] * len(prompts)
+    merged = 0
+    questions = []
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    futures = {pool.submit(call_groq, p): i for i, p in enumerate(prompts)}
+    pending = dict(futures)
+    try:
+        for future in as_completed(futures):
+            i = pending.pop(future)
+            results[i] = _chunk_questions(future, i)
+
+            # Only merge once every earlier chunk is in, to keep chunk order
+            while merged < len(results) and results[merged] is not None:
+                questions.extend(results[merged])
+                merged += 1
+            questions = dedupe_questions(questions)
+
+            if limit is not None and len(questions) >= limit:
+                break
+    finally:
+        keep_going = on_complete is not None and pending
+        pool.shutdown(wait=False, cancel_futures=not keep_going)
+
+    if keep_going:
+        threading.Thread(
+            target=_finish_in_background,
+            args=(pending, results, on_complete),
+            name="fanout-fill",
+            daemon=True,
+        ).start()
+    elif on_complete is not None:
+        on_complete(_merge_results(results))
+
+    return questions[:limit]
 
 
 # ---------------- GENERATE QUESTIONS ----------------
-def generate_questions(role: str, round_type: str):
-    """Generate 5 interview questions based on role and round type"""
+@instrument("generate_questions")
+def generate_questions(role: str, round_type: str, on_token=None):
+    """
+    Generate 5 interview questions based on role and round type.
+    Roles known to the offline question bank are served from it; other
+    repeated (role, round) prompts come from the cached question pool
+    once it is warm. When the model is called, on_token(text_so_far) is
+    invoked as the answer streams in.
+    """
+    bank = get_bank()
+    banked = bank.lookup(role, round_type, k=5)
+    cache_result("question_bank", bool(banked))
+    if banked:
+        return banked
+
     prompt = f"""
 Generate exactly 5 {round_type} interview questions
-for the role of {role}.
+for the role of {role.strip()}.
 Rules:
 - One question per line
 - No numbering
 - No explanations
 """
-    text = call_groq(prompt)
-    questions = [q.strip() for q in text.split("\n") if q.strip()]
-    return questions[:5]
+    key = prompt_key(prompt, MODEL, TEMPERATURE)
+    cached = question_cache.sample(key, 5, min_pool=QUESTION_POOL_SIZE)
+    cache_result("question_pool", bool(cached))
+    if cached:
+        return cached
+
+    try:
+        if on_token is None:
+            text = call_groq(prompt)
+        else:
+            text = ""
+            for token in call_groq_stream(prompt):
+                text += token
+                on_token(text)
+    except Exception:
+        # Provider down: any banked questions for this round beat an error
+        fallback = bank.lookup_any_role(round_type, k=5)
+        if fallback:
+            inc("question_fallback_total", round_type=round_type)
+            return fallback
+        raise
+
+    questions = dedupe_questions(split_questions(text), limit=5)
+    question_cache.add(key, questions)
+    return questions
+
+
+# ---------------- RESUME QUESTION ENGINE ----------------
+RESUME_CHUNKS = int(os.getenv("RESUME_CHUNKS", "3"))
+RESUME_CHUNK_TOKENS = int(os.getenv("RESUME_CHUNK_TOKENS", "200"))
+RESUME_ENGINE_CACHE_SIZE = int(os.getenv("RESUME_ENGINE_CACHE_SIZE", "128"))
+MIN_RESUME_CHARS = 20
+
+RESUME_PROMPT = """
+This is a part of candidate resume:
+{chunk}
+
+Generate interview questions based only on this content.
+Rules:
+- Short questions
+- One question per line
+- No numbering
+"""
+
 
+class ResumeQuestionEngine:
+    """
+    Resume → interview questions in five stages:
+    extract → normalize → chunk → generate → dedupe.
+
+    Every stage is keyed by the SHA-256 of the uploaded file: extracted
+    text lives in the on-disk resume text cache, normalized text in the
+    bounded temp text library, chunks in a small in-memory LRU, and
+    generated questions in the question pool, so a re-upload of the same
+    file skips OCR and, once the pool is warm, the LLM too. Each stage is
+    timed; run() returns the timings and stats() aggregates them.
+    """
 
-def generate_questions_from_resume(file_path: str):
-    """Generate 5 interview questions from resume using OCR → JSON → Chunking → Groq"""
-    resume_text = ""
+    STAGES = ("extract", "normalize", "chunk", "generate", "dedupe")
+    CACHED_STAGES = ("extract", "normalize", "chunk", "generate")
+
+    def __init__(self, k: int = RESUME_CHUNKS, chunk_tokens: int = RESUME_CHUNK_TOKENS,
+                 cache_size: int = RESUME_ENGINE_CACHE_SIZE):
+        self.k = k
+        self.chunk_tokens = chunk_tokens
+        self.cache_size = cache_size
+        self._doc_ids = OrderedDict()  # file hash -> temp_text_library id
+        self._chunks = OrderedDict()   # file hash -> selected chunks
+        self._lock = threading.Lock()
+        self._stats = {stage: {"calls": 0, "hits": 0, "total_ms": 0.0} for stage in self.STAGES}
+
+    # ---------------- PUBLIC API ----------------
+    def run(self, source, name=None, spool=None, limit: int = 5) -> dict:
+        """
+        Questions for a resume given as a path, bytes or binary file
+        (see ocr_utils.extract_text_from_resume). Returns
+        {"questions", "doc_key", "timings"}, timings in ms per stage.
+        Raises ValueError for unsupported or unreadable files.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            name = name or str(source)
+        if not (name or "").lower().endswith(SUPPORTED_EXTENSIONS):
+            raise ValueError("Unsupported resume format. Upload PDF, JPG, or PNG.")
+
+        timings = {}
+        with self._stage("extract", timings) as stage:
+            key, raw, stage["hit"] = read_resume(source, name, spool)
+        if key is None or len(raw.strip()) < MIN_RESUME_CHARS:
+            raise ValueError("Unable to read resume properly. Please upload a clear file.")
+
+        with self._stage("normalize", timings) as stage:
+            text = self._normalized(key, raw, stage)
+        if len(text) < MIN_RESUME_CHARS:
+            raise ValueError("Unable to read resume properly. Please upload a clear file.")
+
+        with self._stage("chunk", timings) as stage:
+            chunks = self._selected_chunks(key, text, stage)
+
+        with self._stage("generate", timings) as stage:
+            candidates = self._generated(key, chunks, limit, stage)
+
+        with self._stage("dedupe", timings):
+            questions = dedupe_questions(candidates, limit=limit)
+
+        return {"questions": questions, "doc_key": key, "timings": timings}
+
+    def stats(self) -> dict:
+        """Per stage: calls, cache hits, total and mean latency in ms"""
+        with self._lock:
+            return {
+                stage: {**s, "mean_ms": s["total_ms"] / s["calls"] if s["calls"] else 0.0}
+                for stage, s in self._stats.items()
+            }
+
+    # ---------------- STAGES ----------------
+    def _normalized(self, key, raw, stage):
+        with self._lock:
+            doc_id = self._doc_ids.get(key)
+        text = temp_text_library.get(doc_id) if doc_id else None
+        if text is not None:
+            stage["hit"] = True
+            return text
+
+        text = normalize_text(raw)
+        self._remember(self._doc_ids, key, store_text_as_json(text))
+        return text
 
-    # PDF
-    if file_path.lower().endswith(".pdf"):
+    def _selected_chunks(self, key, text, stage):
+        with self._lock:
+            chunks = self._chunks.get(key)
+        if chunks is not None:
+            stage["hit"] = True
+            return chunks
+
+        chunks = select_resume_chunks(text, k=self.k, chunk_size=self.chunk_tokens)
+        self._remember(self._chunks, key, chunks)
+        return chunks
+
+    def _generated(self, key, chunks, limit, stage):
+        """Candidate questions from the document's pool, or from the LLM"""
+        pool_key = prompt_key(f"resume:{key}" + RESUME_PROMPT, MODEL, TEMPERATURE)
+        pooled = question_cache.sample(pool_key, 2 * limit, min_pool=QUESTION_POOL_SIZE)
+        if pooled:
+            stage["hit"] = True
+            return pooled
+
+        def fill(questions):
+            if questions:
+                question_cache.add(pool_key, questions)
+
+        # Return with the first `limit` questions; every chunk's answer
+        # still goes into the pool once the slower requests finish
+        prompts = [RESUME_PROMPT.format(chunk=chunk) for chunk in chunks]
+        return fan_out_questions(prompts, limit=limit, on_complete=fill)
+
+    # ---------------- INTERNALS ----------------
+    def _remember(self, cache, key, value):
+        with self._lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+    @contextmanager
+    def _stage(self, name, timings):
+        stage = {"hit": False}
+        start = time.perf_counter()
         try:
-            resume_text = extract_text(file_path)
-        except Exception:
-            resume_text = ""
+            yield stage
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            timings[name] = ms
+            observe("stage_seconds", ms / 1000, stage=f"resume_{name}")
+            if name in self.CACHED_STAGES:
+                cache_result(f"resume_{name}", stage["hit"])
+            with self._lock:
+                s = self._stats[name]
+                s["calls"] += 1
+                s["hits"] += stage["hit"]
+                s["total_ms"] += ms
 
-    # Image
-    elif file_path.lower().endswith((".png", ".jpg", ".jpeg")):
-        resume_text = extract_text_from_image(file_path)
 
-    else:
-        return ["❌ Unsupported resume format. Upload PDF, JPG, or PNG."]
+resume_engine = ResumeQuestionEngine()
 
-    if not resume_text or len(resume_text.strip()) < 20:
-        return ["❌ Unable to read resume properly. Please upload a clear file."]
 
-    # -------- NEW PIPELINE STARTS HERE --------
+def generate_questions_from_resume(file_path: str, name=None, spool=None):
+    """Generate 5 interview questions from a resume with the shared ResumeQuestionEngine"""
+    try:
+        return resume_engine.run(file_path, name, spool)["questions"]
+    except ValueError as e:
+        return [f"❌ {e}"]
 
-    # Step 1: Store as JSON in temporary library
-    doc_id = store_text_as_json(resume_text)
 
-    # Step 2: Chunk the stored text
-    chunks = chunk_text(temp_text_library[doc_id]["content"])
+# ---------------- SCORING ----------------
+SCORE_BATCH_SIZE = int(os.getenv("SCORE_BATCH_SIZE", "5"))
+FALLBACK_FEEDBACK = "Unable to evaluate the answer properly."
+REASK_SUFFIX = """
+    Your previous reply could not be parsed.
+    Reply with the JSON object only, nothing else.
+    """
 
-    # Step 3: Send chunks to Groq
-    combined_questions = []
 
-    for chunk in chunks[:3]:  # limit chunks to avoid token overload
-        prompt = f"""
-        This is a part of candidate resume:
-        {chunk}
+def _stream_score_json(prompt: str, on_feedback=None):
+    """
+    Stream an evaluation and stop reading as soon as the JSON object
+    closes. Truncated output is repaired; None if no usable score came
+    back. on_feedback(text_so_far) receives the feedback while it streams.
+    """
+    parser = JSONStreamParser("{")
+    tokens = call_groq_stream(prompt)
+    shown = ""
+    try:
+        for token in tokens:
+            if parser.feed(token) is not None:
+                break
+            if on_feedback is not None:
+                feedback = (parser.partial() or {}).get("feedback")
+                if isinstance(feedback, str) and feedback != shown:
+                    shown = feedback
+                    on_feedback(feedback)
+    finally:
+        tokens.close()
 
-        Generate interview questions based only on this content.
-        Rules:
-        - Short questions
-        - No numbering
-        """
-        text = call_groq(prompt)
-        qs = [q.strip() for q in text.split("\n") if q.strip()]
-        combined_questions.extend(qs)
-
-        if len(combined_questions) >= 5:
-            break
-
-    # Step 4: Return first 5 unique questions
-    unique_questions = list(dict.fromkeys(combined_questions))
-    return unique_questions[:5]
-def get_scores(question: str, answer: str):
-    """Evaluate candidate answer and return score + feedback"""
+    return parse_score(parser.partial())
+
+
+def parse_score(data):
+    """
+    Normalize a {"score", "feedback"} object from the model.
+    None when the score is missing or not a number, e.g. a reply cut off
+    at `{"score":` that the repair step closed as {"score": null}.
+    """
+    if not isinstance(data, dict):
+        return None
+    score = data.get("score")
+    if isinstance(score, bool):
+        return None
+    try:
+        score = int(score)
+    except (TypeError, ValueError):
+        return None
+    feedback = data.get("feedback") or "No feedback provided."
+    score = max(0, min(score, 10))
+    return {"score": score, "feedback": feedback}
+
+
+@instrument("get_scores")
+def get_scores(question: str, answer: str, on_feedback=None):
+    """
+    Evaluate candidate answer and return score + feedback.
+    on_feedback(text_so_far) is called as the feedback streams in.
+    """
     prompt = f"""
     You are evaluating an interview answer.
     Question: {question}
@@ -168,24 +495,137 @@ def get_scores(question: str, answer: str):
       "feedback": "<2–3 lines of constructive feedback>"
     }}
     """
+    result = None
     try:
-        raw_response = call_groq(prompt)
-        data = json.loads(raw_response)
-        score = int(data.get("score", 0))
-        feedback = data.get("feedback", "No feedback provided.")
-        score = max(0, min(score, 10))
-    except Exception:
-        score = 0
-        feedback = "Unable to evaluate the answer properly."
+        result = _stream_score_json(prompt, on_feedback)
+        if result is None:
+            # Re-ask only when the reply really held no usable score
+            inc("score_reask_total")
+            result = _stream_score_json(prompt + REASK_SUFFIX, on_feedback)
+    except Exception as e:
+        print("⚠️ Scoring failed:", e)
+
+    if result is None:
+        inc("score_fallback_total")
+        result = {"score": 0, "feedback": FALLBACK_FEEDBACK}
 
     # DO NOT modify session_state here. Return result instead.
-    return {"score": score, "feedback": feedback}
+    return result
+
+
+def _is_score_list(value):
+    """An array holding score objects, not an echoed "[0]" or the like"""
+    return isinstance(value, list) and any(isinstance(item, dict) for item in value)
+
+
+def _score_group(pairs):
+    """Score several (question, answer) pairs with one structured request"""
+    items = "\n".join(
+        f"[{n}] Question: {q}\n    Candidate Answer: {a}"
+        for n, (q, a) in enumerate(pairs)
+    )
+    prompt = f"""
+    You are evaluating {len(pairs)} interview answers.
+{items}
+    Evaluate each based on:
+      - Relevance
+      - Clarity
+      - Technical correctness
+      - Completeness
+    Respond ONLY with a valid JSON array, one object per answer, in order:
+    [
+      {{"id": <answer number>, "score": <integer between 0 and 10>, "feedback": "<2–3 lines of constructive feedback>"}}
+    ]
+    """
+    results = [None] * len(pairs)
+    try:
+        data = extract_json(call_groq(prompt, max_tokens=120 * len(pairs)), "[", _is_score_list) or []
+        for n, item in enumerate(data):
+            # A bad item is left for the per-pair fallback, the rest still count
+            if not isinstance(item, dict):
+                continue
+            try:
+                idx = int(item.get("id", n))
+            except (TypeError, ValueError):
+                idx = n
+            if 0 <= idx < len(pairs) and results[idx] is None:
+                results[idx] = parse_score(item)
+    except Exception as e:
+        print("⚠️ Batch scoring failed, scoring individually:", e)
+
+    # Anything the batch answer missed is scored on its own
+    for n, r in enumerate(results):
+        if r is None:
+            results[n] = get_scores(*pairs[n])
+    return results
+
+
+@instrument("get_scores_batch")
+def get_scores_batch(pairs, mode: str = "structured", max_workers: int = FANOUT_WORKERS):
+    """
+    Score many (question, answer) pairs; results come back in input order.
+    mode="structured" packs SCORE_BATCH_SIZE pairs into each request,
+    mode="concurrent" sends one request per pair. Requests run at most
+    max_workers at a time.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        if mode == "concurrent":
+            return list(pool.map(lambda p: get_scores(*p), pairs))
+
+        groups = [
+            pairs[i:i + SCORE_BATCH_SIZE]
+            for i in range(0, len(pairs), SCORE_BATCH_SIZE)
+        ]
+        return [r for group in pool.map(_score_group, groups) for r in group]
+
+
+# ---------------- BACKGROUND SCORING ----------------
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "8"))
+_scoring_pool = None
+_scoring_pool_lock = threading.Lock()
+
+
+def submit_scoring_job(question: str, answer: str):
+    """Queue get_scores on the shared scoring pool and return its Future"""
+    global _scoring_pool
+    with _scoring_pool_lock:
+        if _scoring_pool is None:
+            _scoring_pool = ThreadPoolExecutor(
+                max_workers=SCORING_WORKERS, thread_name_prefix="scoring"
+            )
+    return _scoring_pool.submit(get_scores, question, answer)
+
+
+def collect_scoring_jobs(jobs: dict, scores: list, feedbacks: list, on_result=None) -> int:
+    """
+    Move finished results from `jobs` ({question index: Future}) into
+    scores/feedbacks, calling on_result(i, result) for each one.
+    Returns how many jobs are still pending.
+    """
+    for i, future in list(jobs.items()):
+        if not future.done():
+            continue
+        try:
+            r = future.result()
+        except Exception:
+            r = {"score": 0, "feedback": FALLBACK_FEEDBACK}
+        scores[i] = r["score"]
+        feedbacks[i] = r["feedback"]
+        del jobs[i]
+        if on_result is not None:
+            on_result(i, r)
+    return len(jobs)
 
 
 
 # ---------------- FINAL FEEDBACK ----------------
 def final_feedback():
     """Calculate overall average score and provide verdict"""
+    import streamlit as st
     scores = st.session_state.get("scores", [])
     if not scores:
         return "No interview data available."
@@ -0,0 +1,55 @@
+"""
+Login throughput per password-hashing cost setting.
+
+For each setting, verifies `--logins` passwords on one thread and then on
+`--workers` threads, and reports logins/sec overall and per core.
+
+    python benchmarks/bench_login.py --logins 50 --workers 4
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth import ScryptHasher, PBKDF2Hasher
+
+SETTINGS = [
+    ("scrypt n=2^13", ScryptHasher(n=2 ** 13)),
+    ("scrypt n=2^14", ScryptHasher(n=2 ** 14)),
+    ("scrypt n=2^15", ScryptHasher(n=2 ** 15)),
+    ("pbkdf2 200k", PBKDF2Hasher(iterations=200_000)),
+    ("pbkdf2 600k", PBKDF2Hasher(iterations=600_000)),
+]
+
+
+def run(hasher, logins, workers):
+    encoded = hasher.hash("correct horse battery staple")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(
+            lambda _: hasher.verify("correct horse battery staple", encoded),
+            range(logins),
+        ))
+    elapsed = time.perf_counter() - start
+    assert all(results)
+    return logins / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"{'setting':<16}{'1 thread/s':>12}{f'{args.workers} threads/s':>16}{'per core/s':>12}")
+    for name, hasher in SETTINGS:
+        single = run(hasher, args.logins, 1)
+        parallel = run(hasher, args.logins, args.workers)
+        print(f"{name:<16}{single:>12.1f}{parallel:>16.1f}{parallel / args.workers:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Cold-start import cost of the app's modules, from `python -X importtime`.
+
+Each module is imported in a fresh interpreter. The report shows the
+total import time and the packages that account for most of it, so
+anything heavy that creeps back into a top-level import stands out.
+
+    python benchmarks/importtime_report.py
+    python benchmarks/importtime_report.py backend ocr_utils --top 10
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Everything app.py imports before the login page renders, plus
+# streamlit itself as the floor no page can go below
+DEFAULT_MODULES = ["streamlit", "auth", "backend", "session_store", "ocr_utils", "pdf_utils"]
+
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def importtime(module):
+    """
+    [(self_us, cumulative_us, depth, name)] for a cold `import module`,
+    limited to the module's own subtree (interpreter startup is left out)
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((int(self_us), int(cumulative_us), len(indent) // 2, name))
+
+    # Children are listed before their parent: walk back from the module's line
+    end = max(i for i, entry in enumerate(entries) if entry[2] == 0 and entry[3] == module)
+    start = end
+    while start > 0 and entries[start - 1][2] > 0:
+        start -= 1
+    return entries[start:end + 1]
+
+
+def summarize(entries, top):
+    """Total ms and the `top` root packages by self time, in ms"""
+    total = sum(cumulative for _, cumulative, depth, _ in entries if depth == 0)
+    by_package = defaultdict(int)
+    for self_us, _, _, name in entries:
+        by_package[name.split(".")[0]] += self_us
+    heaviest = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return total / 1000, [(name, us / 1000) for name, us in heaviest]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=5, help="packages to list per module")
+    args = parser.parse_args()
+
+    print(f"{'module':<16}{'total ms':>10}   heaviest packages (self ms)")
+    for module in args.modules:
+        try:
+            total, heaviest = summarize(importtime(module), args.top)
+        except RuntimeError as e:
+            print(f"{module:<16}{'failed':>10}   {e}")
+            continue
+        packages = ", ".join(f"{name} {ms:.1f}" for name, ms in heaviest)
+        print(f"{module:<16}{total:>10.1f}   {packages}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+Load test: how many concurrent interviews one instance can handle.
+
+Starts a local stand-in for the Groq chat-completions API with
+configurable latency and error injection, points the real Groq client at
+it through GROQ_BASE_URL, then drives simulated candidates through the
+backend functions the app uses:
+
+    generate_questions → N × get_scores → generate_pdf
+
+Sessions run on threads, as Streamlit runs them. Reports throughput,
+p50/p95/p99 latency per step and memory per session (tracemalloc).
+
+    python benchmarks/loadtest.py --sessions 50 --concurrency 10
+    python benchmarks/loadtest.py --latency 0.8 --error-rate 0.05 --llm-rate 50
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STAGES = ["generate_questions", "get_scores", "generate_pdf", "session"]
+
+
+# ---------------- MOCK GROQ SERVER ----------------
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        mock = self.server.mock
+        delay, fail = mock.plan()
+        time.sleep(delay)
+        if fail:
+            self._send_json(mock.error_status, {
+                "error": {"message": "injected failure", "type": "server_error"}
+            })
+            return
+
+        content = mock.answer(body)
+        prompt_chars = sum(len(m.get("content", "")) for m in body.get("messages", []))
+        usage = {
+            "prompt_tokens": prompt_chars // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (prompt_chars + len(content)) // 4,
+        }
+        if body.get("stream"):
+            self._stream(body, content, usage, mock.token_delay)
+        else:
+            self._send_json(200, {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+
+    def _stream(self, body, content, usage, token_delay):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def chunk(delta, finish=None, **extra):
+            return {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                **extra,
+            }
+
+        events = [chunk({"role": "assistant", "content": content[i:i + 4]})
+                  for i in range(0, len(content), 4)]
+        events.append(chunk({}, "stop", x_groq={"id": "req-mock", "usage": usage}))
+        try:
+            for event in events:
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+                self.wfile.flush()
+                if token_delay:
+                    time.sleep(token_delay)
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped reading early (e.g. score JSON complete)
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # the default backlog of 5 stalls bursts of connects
+
+
+class MockGroq:
+    """
+    Chat-completions stand-in. Each request waits `latency` seconds
+    (± `jitter` as a fraction) before the first byte and fails with
+    `error_status` at `error_rate`. Answers come from llm_client's
+    FakeBackend, so questions and score JSON look like the real thing.
+    """
+
+    def __init__(self, latency=0.3, jitter=0.5, error_rate=0.0, error_status=503,
+                 token_delay=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.token_delay = token_delay
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._seed = seed
+        self._content = None
+        self._lock = threading.Lock()
+        self._server = None
+
+    def start(self) -> str:
+        """Serve on a free local port; returns the base URL"""
+        self._server = _Server(("127.0.0.1", 0), _MockHandler)
+        self._server.mock = self
+        threading.Thread(target=self._server.serve_forever, name="mock-groq", daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def plan(self):
+        """(delay, fail) for the next request"""
+        with self._lock:
+            self.requests += 1
+            fail = self._random.random() < self.error_rate
+            self.errors += fail
+            spread = self._random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(0.0, self.latency * spread), fail
+
+    def answer(self, body) -> str:
+        # Imported on first request, after main() has set GROQ_BASE_URL
+        with self._lock:
+            if self._content is None:
+                from llm_client import FakeBackend
+                self._content = FakeBackend(latency=0, seed=self._seed)
+        return self._content.complete(body.get("model"), body["messages"], 0, 0, 1)
+
+
+# ---------------- SIMULATED CANDIDATES ----------------
+def run_session(n, role, round_type, answers, out_dir):
+    """One candidate end to end; returns {stage: [seconds]} and the fallback count"""
+    from backend import generate_questions, get_scores, FALLBACK_FEEDBACK
+    from pdf_utils import generate_pdf
+
+    samples = defaultdict(list)
+    session_start = time.perf_counter()
+
+    start = time.perf_counter()
+    questions = generate_questions(role, round_type, on_token=lambda text: None)
+    samples["generate_questions"].append(time.perf_counter() - start)
+
+    asked, given, scores, feedbacks = [], [], [], []
+    fallbacks = 0
+    for i in range(answers):
+        question = questions[i % len(questions)]
+        answer = (f"Candidate {n}: in my last project I owned {question[:40].lower()} "
+                  f"end to end, measured the impact and iterated on it.")
+        start = time.perf_counter()
+        result = get_scores(question, answer, on_feedback=lambda text: None)
+        samples["get_scores"].append(time.perf_counter() - start)
+        fallbacks += result["feedback"] == FALLBACK_FEEDBACK
+        asked.append(question)
+        given.append(answer)
+        scores.append(result["score"])
+        feedbacks.append(result["feedback"])
+
+    start = time.perf_counter()
+    path = generate_pdf(
+        role, round_type, asked, given, feedbacks, scores,
+        round(sum(scores) / max(1, len(scores)), 2),
+        file_name=os.path.join(out_dir, f"report_{n}.pdf"),
+    )
+    os.remove(path)
+    samples["generate_pdf"].append(time.perf_counter() - start)
+
+    samples["session"].append(time.perf_counter() - session_start)
+    return samples, fallbacks
+
+
+def measure_session_memory(args, out_dir):
+    """Peak and retained traced memory of one session run on its own"""
+    import gc
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run_session(-1, args.role, args.round, args.answers, out_dir)
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, retained
+
+
+def percentile(values, q):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def fmt_bytes(n):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if n < 1024 or unit == "GiB":
+            return f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def max_rss():
+    """Peak resident set size in bytes, where the platform reports it"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+# ---------------- MAIN ----------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--answers", type=int, default=5, help="answers scored per session")
+    parser.add_argument("--role", default="Load Test Engineer")
+    parser.add_argument("--round", default="Technical")
+    parser.add_argument("--latency", type=float, default=0.3, help="mock time to first byte, seconds")
+    parser.add_argument("--jitter", type=float, default=0.5, help="latency spread, fraction")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--llm-rate", type=float, help="override LLM_RATE (requests/s, whole process)")
+    parser.add_argument("--trace-load", action="store_true",
+                        help="also trace memory during the load phase (slower)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    # Fresh caches so every run starts cold and nothing lands in the repo
+    scratch = tempfile.TemporaryDirectory(prefix="loadtest_")
+    os.environ.setdefault("CACHE_DIR", os.path.join(scratch.name, "cache"))
+    os.environ.setdefault("QUESTION_BANK_PATH", os.path.join(scratch.name, "bank.json.gz"))
+
+    mock = MockGroq(args.latency, args.jitter, args.error_rate, args.error_status,
+                    args.token_delay, args.seed)
+    os.environ["GROQ_BASE_URL"] = mock.start()
+    os.environ["GROQ_API_KEY"] = "mock"
+    os.environ["LLM_BACKEND"] = "groq"
+    if args.llm_rate:
+        os.environ["LLM_RATE"] = str(args.llm_rate)
+        os.environ["LLM_BURST"] = str(max(1, int(args.llm_rate)))
+
+    from llm_client import LLM_RATE
+
+    print(f"Mock Groq at {os.environ['GROQ_BASE_URL']}: latency {args.latency}s "
+          f"±{args.jitter:.0%}, errors {args.error_rate:.0%} ({args.error_status}), "
+          f"LLM_RATE {LLM_RATE:g}/s")
+    print(f"{args.sessions} sessions, concurrency {args.concurrency}, {args.answers} answers each")
+
+    out_dir = scratch.name
+    # Warm-up: imports, client, connection pool
+    run_session(-1, args.role, args.round, 1, out_dir)
+    peak, retained = measure_session_memory(args, out_dir)
+
+    samples = defaultdict(list)
+    fallbacks = failed = 0
+    requests_before, errors_before = mock.requests, mock.errors
+    if args.trace_load:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [
+            pool.submit(run_session, n, args.role, args.round, args.answers, out_dir)
+            for n in range(args.sessions)
+        ]
+        for future in as_completed(futures):
+            try:
+                session_samples, session_fallbacks = future.result()
+            except Exception as e:
+                print("⚠️ Session failed:", type(e).__name__, e)
+                failed += 1
+                continue
+            for stage, values in session_samples.items():
+                samples[stage].extend(values)
+            fallbacks += session_fallbacks
+    elapsed = time.perf_counter() - start
+    load_peak = tracemalloc.get_traced_memory()[1] if args.trace_load else None
+    if args.trace_load:
+        tracemalloc.stop()
+    llm_requests = mock.requests - requests_before
+    injected = mock.errors - errors_before
+    mock.stop()
+
+    completed = args.sessions - failed
+    print(f"\nThroughput: {completed / elapsed:.2f} sessions/s, "
+          f"{llm_requests / elapsed:.1f} LLM requests/s "
+          f"({llm_requests} requests, {injected} injected errors) in {elapsed:.1f}s")
+    print(f"\n{'stage':<20}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    report = {}
+    for stage in STAGES:
+        values = samples.get(stage)
+        if not values:
+            continue
+        row = {
+            "count": len(values),
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "mean_ms": sum(values) / len(values) * 1000,
+        }
+        report[stage] = row
+        print(f"{stage:<20}{row['count']:>7}{row['p50_ms']:>10.0f}{row['p95_ms']:>10.0f}"
+              f"{row['p99_ms']:>10.0f}{row['mean_ms']:>10.0f}")
+
+    print(f"\nFallback scores: {fallbacks} / {len(samples.get('get_scores', []))}   "
+          f"Failed sessions: {failed}")
+    print(f"Memory per session (isolated, tracemalloc): peak {fmt_bytes(peak)}, "
+          f"retained {fmt_bytes(retained)}")
+    if load_peak is not None:
+        print(f"Traced peak under load: {fmt_bytes(load_peak)} "
+              f"({fmt_bytes(load_peak / args.concurrency)} per concurrent session)")
+    rss = max_rss()
+    if rss:
+        print(f"Peak RSS: {fmt_bytes(rss)}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "config": vars(args),
+                "elapsed_s": elapsed,
+                "sessions_per_s": completed / elapsed,
+                "llm_requests": llm_requests,
+                "injected_errors": injected,
+                "failed_sessions": failed,
+                "fallback_scores": fallbacks,
+                "stages": report,
+                "session_peak_bytes": peak,
+                "session_retained_bytes": retained,
+                "load_peak_bytes": load_peak,
+                "max_rss_bytes": rss,
+            }, f, indent=2)
+
+    scratch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
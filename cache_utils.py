@@ -0,0 +1,242 @@
+import os
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+# ---------------- SETTINGS ----------------
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+RESUME_CACHE_MAX_BYTES = int(os.getenv("RESUME_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+RESUME_CACHE_MAX_AGE = int(os.getenv("RESUME_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+PROMPT_CACHE_TTL = int(os.getenv("PROMPT_CACHE_TTL", str(30 * 24 * 3600)))
+PROMPT_CACHE_MEMORY_ENTRIES = int(os.getenv("PROMPT_CACHE_MEMORY_ENTRIES", "256"))
+
+
+def sha256_bytes(data: bytes) -> str:
+    """Hex SHA-256 of raw bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(file_path, block_size: int = 1 << 20) -> str:
+    """Hex SHA-256 of a file, read in blocks"""
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ---------------- DISK CACHE ----------------
+class DiskCache:
+    """
+    Content-addressed JSON cache on disk.
+    One file per key; evicts entries older than max_age and, when the
+    directory grows past max_bytes, the least recently used entries.
+    """
+
+    def __init__(self, directory, max_bytes=RESUME_CACHE_MAX_BYTES, max_age=RESUME_CACHE_MAX_AGE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached value or None"""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                self._remove(path)
+                raise FileNotFoundError(path)
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """Store a JSON-serializable value and enforce the size budget"""
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries, then oldest-used ones until under max_bytes"""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if now - st.st_mtime > self.max_age:
+                self._remove(path)
+            else:
+                entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self.evictions += 1
+
+    def stats(self):
+        """Hit/miss/eviction counters"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# ---------------- PROMPT CACHE ----------------
+def prompt_key(prompt: str, model: str, temperature: float) -> str:
+    """Cache key for a prompt: case and whitespace are ignored"""
+    normalized = " ".join(prompt.lower().split())
+    return sha256_bytes(f"{model}|{temperature}|{normalized}".encode())
+
+
+class PromptCache:
+    """
+    Pools of LLM outputs (e.g. generated questions) per prompt key.
+    An in-memory LRU sits in front of a SQLite table; items expire
+    after `ttl` seconds. `fills` counts how many LLM answers went in
+    and starts over once every item has expired.
+    """
+
+    def __init__(self, db_path, ttl=PROMPT_CACHE_TTL, max_entries=PROMPT_CACHE_MEMORY_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> (fills, [(created, item), ...])
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS prompt_pool (
+                key TEXT,
+                item TEXT,
+                created REAL,
+                PRIMARY KEY (key, item)
+            );
+            CREATE TABLE IF NOT EXISTS prompt_fills (
+                key TEXT PRIMARY KEY,
+                fills INTEGER
+            );
+        """)
+        self._conn.commit()
+
+    def _load(self, key):
+        """Entry from memory, falling back to SQLite. Caller holds the lock."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        rows = self._conn.execute(
+            "SELECT created, item FROM prompt_pool WHERE key = ?", (key,)
+        ).fetchall()
+        row = self._conn.execute(
+            "SELECT fills FROM prompt_fills WHERE key = ?", (key,)
+        ).fetchone()
+        entry = (row[0] if row else 0, rows)
+
+        self._memory[key] = entry
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+        return entry
+
+    def get(self, key):
+        """Return (fills, live items) for a key"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            fills, items = self._load(key)
+            live = [item for created, item in items if created >= cutoff]
+            return (fills if live else 0), live
+
+    def add(self, key, items):
+        """Add one LLM answer's worth of items to the pool"""
+        now = time.time()
+        cutoff = now - self.ttl
+        with self._lock:
+            fills, pool = self._load(key)
+            pool = [(c, i) for c, i in pool if c >= cutoff]
+            if not pool:
+                fills = 0  # the answers counted so far have all expired
+            known = {item for _, item in pool}
+            pool += [(now, item) for item in dict.fromkeys(items) if item not in known]
+            self._memory[key] = (fills + 1, pool)
+
+            self._conn.execute(
+                "DELETE FROM prompt_pool WHERE key = ? AND created < ?", (key, cutoff)
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO prompt_pool (key, item, created) VALUES (?, ?, ?)",
+                [(key, item, now) for item in items],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO prompt_fills (key, fills) VALUES (?, ?)",
+                (key, fills + 1),
+            )
+            self._conn.commit()
+
+    def sample(self, key, k, min_pool, min_fills=3):
+        """
+        k random items once the pool is warm (at least `min_pool` items,
+        or `min_fills` answers collected), otherwise None.
+        """
+        fills, items = self.get(key)
+        warm = len(items) >= max(k, min_pool) or (fills >= min_fills and len(items) >= k)
+        with self._lock:
+            if warm:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return random.sample(items, k) if warm else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+            }
+
+
+# Extracted resume text, keyed by SHA-256 of the uploaded file
+resume_text_cache = DiskCache(os.path.join(CACHE_DIR, "resume_text"))
+
+# Pools of generated interview questions, keyed by prompt
+question_cache = PromptCache(os.path.join(CACHE_DIR, "prompt_cache.db"))
@@ -0,0 +1,149 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_PATH = os.getenv("DB_PATH", "users.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+
+# ---------------- MIGRATIONS ----------------
+# Applied in order; PRAGMA user_version records how many have run.
+# Never edit an entry once shipped, append a new one instead.
+MIGRATIONS = [
+    # 1: accounts
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE,
+        password TEXT
+    );
+    """,
+    # 2: login sessions
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        token TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        created REAL NOT NULL,
+        expires REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(user_id);
+    """,
+    # 3: interview progress, one row per interview plus one per question
+    """
+    CREATE TABLE IF NOT EXISTS interviews (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        role TEXT NOT NULL,
+        round_type TEXT NOT NULL,
+        current_q INTEGER NOT NULL DEFAULT 0,
+        completed INTEGER NOT NULL DEFAULT 0,
+        updated REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_interviews_user
+        ON interviews(user_id, completed, updated);
+    CREATE TABLE IF NOT EXISTS interview_items (
+        interview_id INTEGER NOT NULL REFERENCES interviews(id) ON DELETE CASCADE,
+        idx INTEGER NOT NULL,
+        question TEXT NOT NULL,
+        answer TEXT NOT NULL DEFAULT '',
+        score INTEGER,
+        feedback TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (interview_id, idx)
+    ) WITHOUT ROWID;
+    """,
+]
+
+
+def migrate(conn):
+    """Bring the schema up to date; safe to call on every start"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {number};\nCOMMIT;")
+
+
+# ---------------- CONNECTION POOL ----------------
+class ConnectionPool:
+    """
+    Fixed-size pool of SQLite connections shared across threads.
+    Connections run in WAL mode so readers never block the writer, and
+    keep a statement cache so repeated SQL is only compiled once.
+    """
+
+    def __init__(self, path: str = DB_PATH, size: int = DB_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=10,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commits on success, rolls back on error"""
+        conn = self._acquire()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        """Close idle connections (used by tests and tools)"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._created -= 1
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Process-wide pool; migrations run once, when it is first created"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            pool = ConnectionPool()
+            with pool.connection() as conn:
+                migrate(conn)
+            _pool = pool
+        return _pool
@@ -0,0 +1,67 @@
+import os
+import re
+import zlib
+
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.7"))
+EMBED_DIM = 1024
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+# Question framing that says nothing about the topic
+_STOPWORDS = frozenset("""
+a an the and or of to in on for with at by from about into over
+is are was were be been do does did have has had can could would should will
+you your yours me my i we our us it its this that these those there their
+what which who whom when where why how
+tell describe explain walk through give share talk discuss elaborate briefly
+please example examples time times some any kind
+""".split())
+
+
+def _features(text):
+    words = [w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS]
+    features = list(words)
+    for w in words:
+        padded = f"<{w}>"
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+def embed(texts, dim: int = EMBED_DIM):
+    """
+    Hashed bag of topic words plus their character trigrams, one
+    L2-normalised NumPy row per text. No model download, no network.
+    """
+    import numpy as np
+
+    rows, cols = [], []
+    for r, text in enumerate(texts):
+        for f in _features(text):
+            rows.append(r)
+            cols.append(zlib.crc32(f.encode()) % dim)
+
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    np.add.at(vectors, (rows, cols), 1.0)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-9)
+
+
+def dedupe_questions(questions, threshold: float = DEDUP_THRESHOLD, limit: int = None):
+    """
+    Drop questions whose cosine similarity to an earlier kept question is
+    at least `threshold`. Order is preserved; stops after `limit` kept.
+    """
+    questions = list(dict.fromkeys(q.strip() for q in questions if q.strip()))
+    if len(questions) < 2:
+        return questions[:limit]
+
+    vectors = embed(questions)
+    similarity = vectors @ vectors.T
+
+    kept = []
+    for i in range(len(questions)):
+        if not kept or similarity[i, kept].max() < threshold:
+            kept.append(i)
+            if limit is not None and len(kept) >= limit:
+                break
+    return [questions[i] for i in kept]
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import zlib
+import threading
+from collections import OrderedDict
+from uuid import uuid4
+
+from cache_utils import CACHE_DIR
+
+DOCUMENT_TTL = int(os.getenv("DOCUMENT_TTL", "900"))
+DOCUMENT_MEMORY_BYTES = int(os.getenv("DOCUMENT_MEMORY_BYTES", str(8 * 1024 * 1024)))
+DOCUMENT_DISK_BYTES = int(os.getenv("DOCUMENT_DISK_BYTES", str(256 * 1024 * 1024)))
+DOCUMENT_SPILL_DIR = os.getenv("DOCUMENT_SPILL_DIR", os.path.join(CACHE_DIR, "documents"))
+
+
+class DocumentStore:
+    """
+    Bounded store for extracted resume documents.
+    Documents are kept as zlib-compressed JSON in an in-memory LRU capped
+    at `memory_bytes`; least recently used ones spill to `spill_dir`
+    (itself capped at `disk_bytes`). Everything expires after `ttl`.
+    Spill files already in `spill_dir` (from an earlier process) are
+    adopted on start, so they count against the budget and expire too.
+    """
+
+    def __init__(
+        self,
+        ttl=DOCUMENT_TTL,
+        memory_bytes=DOCUMENT_MEMORY_BYTES,
+        disk_bytes=DOCUMENT_DISK_BYTES,
+        spill_dir=DOCUMENT_SPILL_DIR,
+    ):
+        self.ttl = ttl
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.spill_dir = spill_dir
+        self._memory = OrderedDict()  # doc_id -> (created, blob)
+        self._disk = OrderedDict()    # doc_id -> (created, size)
+        self._memory_used = 0
+        self._disk_used = 0
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "spills": 0, "evictions": 0, "expired": 0}
+        with self._lock:
+            self._adopt_spilled()
+
+    # ---------------- PUBLIC API ----------------
+    def put(self, text: str) -> str:
+        """Store text and return its document id"""
+        doc_id = str(uuid4())
+        blob = zlib.compress(json.dumps({"content": text}).encode(), 6)
+        with self._lock:
+            self._memory[doc_id] = (time.time(), blob)
+            self._memory_used += len(blob)
+            self._enforce_memory_budget()
+        return doc_id
+
+    def get(self, doc_id: str):
+        """Document text, or None if unknown or expired"""
+        with self._lock:
+            entry = self._memory.get(doc_id)
+            if entry is not None:
+                self._memory.move_to_end(doc_id)
+            elif doc_id in self._disk:
+                entry = (self._disk[doc_id][0], self._read_spilled(doc_id))
+
+            if entry is None or entry[1] is None or time.time() - entry[0] > self.ttl:
+                self.counters["misses"] += 1
+                return None
+            self.counters["hits"] += 1
+
+        return json.loads(zlib.decompress(entry[1]))["content"]
+
+    def delete(self, doc_id: str):
+        with self._lock:
+            self._drop(doc_id)
+
+    def sweep(self) -> int:
+        """Drop expired documents from both tiers; returns how many went"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [k for k, (created, _) in self._memory.items() if created < cutoff]
+            expired += [k for k, (created, _) in self._disk.items() if created < cutoff]
+            for doc_id in expired:
+                self._drop(doc_id)
+            self.counters["expired"] += len(expired)
+        return len(expired)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_documents": len(self._memory),
+                "memory_bytes": self._memory_used,
+                "disk_documents": len(self._disk),
+                "disk_bytes": self._disk_used,
+                **self.counters,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._memory) + len(self._disk)
+
+    # ---------------- INTERNALS (lock held) ----------------
+    def _spill_path(self, doc_id):
+        return os.path.join(self.spill_dir, f"{doc_id}.z")
+
+    def _adopt_spilled(self):
+        """Index leftover spill files, oldest first; drop expired ones"""
+        try:
+            names = [n for n in os.listdir(self.spill_dir) if n.endswith(".z")]
+        except OSError:
+            return  # not created yet
+        files = []
+        for name in names:
+            try:
+                st = os.stat(os.path.join(self.spill_dir, name))
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, name[:-2]))
+
+        cutoff = time.time() - self.ttl
+        for created, size, doc_id in sorted(files):
+            self._disk[doc_id] = (created, size)
+            self._disk_used += size
+            if created < cutoff:
+                self._drop(doc_id)
+        self._enforce_memory_budget()
+
+    def _enforce_memory_budget(self):
+        while self._memory_used > self.memory_bytes and len(self._memory) > 1:
+            doc_id, (created, blob) = self._memory.popitem(last=False)
+            self._memory_used -= len(blob)
+            try:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                with open(self._spill_path(doc_id), "wb") as f:
+                    f.write(blob)
+            except OSError as e:
+                print("⚠️ Document spill failed:", e)
+                self.counters["evictions"] += 1
+                continue
+            self._disk[doc_id] = (created, len(blob))
+            self._disk_used += len(blob)
+            self.counters["spills"] += 1
+
+        while self._disk_used > self.disk_bytes and self._disk:
+            self._drop(next(iter(self._disk)))
+            self.counters["evictions"] += 1
+
+    def _read_spilled(self, doc_id):
+        try:
+            with open(self._spill_path(doc_id), "rb") as f:
+                return f.read()
+        except OSError:
+            self._drop(doc_id)
+            return None
+
+    def _drop(self, doc_id):
+        entry = self._memory.pop(doc_id, None)
+        if entry is not None:
+            self._memory_used -= len(entry[1])
+        entry = self._disk.pop(doc_id, None)
+        if entry is not None:
+            self._disk_used -= entry[1]
+            try:
+                os.remove(self._spill_path(doc_id))
+            except OSError:
+                pass
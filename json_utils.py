@@ -0,0 +1,153 @@
+import re
+import json
+
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def loads_lenient(text: str):
+    """json.loads that also accepts trailing commas"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return json.loads(_TRAILING_COMMA.sub(r"\1", text))
+
+
+def repair_json(fragment: str) -> str:
+    """
+    Close whatever a truncated JSON fragment left open: an unfinished
+    string, a dangling key or comma, and any open objects/arrays.
+    """
+    stack = []
+    in_string = False
+    escaped = False
+    for ch in fragment:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+        elif ch in "}]" and stack:
+            stack.pop()
+
+    text = fragment
+    if in_string:
+        text += "\\" if escaped else ""
+        text += '"'
+    text = text.rstrip()
+    if text.endswith(":"):
+        text += " null"
+    text = text.rstrip(",")
+    return text + "".join(reversed(stack))
+
+
+class JSONStreamParser:
+    """
+    Incrementally find the first complete JSON object (or array) in a
+    stream of text. Prose, code fences and anything after the value are
+    ignored. feed() returns the parsed value as soon as it closes, so the
+    caller can stop reading the stream there. Values failing `accept`
+    (e.g. an echoed "[0]" before the real array) are skipped like prose.
+    """
+
+    def __init__(self, opener: str = "{", accept=None):
+        self.opener = opener
+        self.accept = accept
+        self.closer = _CLOSERS[opener]
+        self.buffer = ""
+        self.value = None
+        self.done = False
+        self._reset_scan(0)
+
+    def _reset_scan(self, start):
+        self._start = self.buffer.find(self.opener, start) if self.buffer else -1
+        self._pos = self._start if self._start >= 0 else len(self.buffer)
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str):
+        """Add text; returns the parsed value once complete, else None"""
+        if self.done:
+            return self.value
+        self.buffer += chunk
+
+        while True:
+            if self._start < 0:
+                self._start = self.buffer.find(self.opener, self._pos)
+                if self._start < 0:
+                    self._pos = len(self.buffer)
+                    return None
+                self._pos = self._start
+
+            end = self._scan()
+            if end is None:
+                return None
+
+            try:
+                value = loads_lenient(self.buffer[self._start:end])
+            except ValueError:
+                # Not JSON after all (e.g. a brace in prose); look further on
+                self._reset_scan(self._start + 1)
+                continue
+            if self.accept is not None and not self.accept(value):
+                self._reset_scan(self._start + 1)
+                continue
+            self.value = value
+            self.done = True
+            return value
+
+    def _scan(self):
+        """Advance over new text; returns the end index when the value closes"""
+        buf = self.buffer
+        for i in range(self._pos, len(buf)):
+            ch = buf[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._pos = i + 1
+                    return i + 1
+        self._pos = len(buf)
+        return None
+
+    def partial(self):
+        """Best-effort value from an incomplete stream, or None"""
+        if self.done:
+            return self.value
+        if self._start < 0:
+            return None
+        try:
+            value = loads_lenient(repair_json(self.buffer[self._start:]))
+        except ValueError:
+            return None
+        if self.accept is not None and not self.accept(value):
+            return None
+        return value
+
+
+def extract_json(text: str, opener: str = "{", accept=None):
+    """
+    First JSON object (or array with opener="[") in free-form model
+    output that passes `accept`, repairing it if the output was cut off.
+    None if nothing parses.
+    """
+    parser = JSONStreamParser(opener, accept)
+    value = parser.feed(text)
+    return value if value is not None else parser.partial()
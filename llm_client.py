@@ -0,0 +1,395 @@
+import os
+import json
+import time
+import random
+import threading
+
+from metrics import inc, record_tokens
+
+# ---------------- SETTINGS ----------------
+LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")           # "groq" or "fake"
+LLM_RATE = float(os.getenv("LLM_RATE", "5"))             # requests / second, whole process
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "30"))    # seconds per call, retries included
+LLM_ATTEMPT_TIMEOUT = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "15"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None      # e.g. a local mock server
+
+
+class LLMError(Exception):
+    """Base error for the LLM client layer"""
+
+
+class TransientLLMError(LLMError):
+    """Retryable failure (used by the fake backend)"""
+
+
+class CircuitOpenError(LLMError):
+    """Raised without calling the provider while the breaker is open"""
+
+
+class DeadlineExceeded(LLMError):
+    """The per-call deadline ran out before a response arrived"""
+
+
+# ---------------- RATE LIMITER ----------------
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens/second, up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float = None) -> bool:
+        """Take one token, waiting up to `timeout` seconds. False on timeout."""
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if end is not None:
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+# ---------------- CIRCUIT BREAKER ----------------
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds, then lets a single probe call through.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        """
+        "pass" while closed, "probe" to the one call let through while
+        half-open, None (falsy) when the call is rejected.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return "pass"
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._probing:
+                return None
+            self._probing = True
+            return "probe"
+
+    def release(self):
+        """Give back the probe slot granted by allow() when the call never went out"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+# ---------------- BACKENDS ----------------
+class GroqBackend:
+    """Groq chat completions over one pooled, keep-alive HTTP client"""
+
+    def __init__(self, api_key: str, max_connections: int = LLM_MAX_CONNECTIONS,
+                 base_url: str = GROQ_BASE_URL):
+        from groq import Groq, DefaultHttpxClient
+        import httpx
+
+        self.client = Groq(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,  # retries are handled by LLMClient
+            http_client=DefaultHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                )
+            ),
+        )
+
+    def complete(self, model, messages, temperature, max_tokens, timeout) -> str:
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+        )
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            record_tokens(model, usage.prompt_tokens, usage.completion_tokens)
+        return response.choices[0].message.content.strip()
+
+    def stream(self, model, messages, temperature, max_tokens, timeout):
+        """Yield content deltas; closing the generator closes the HTTP stream"""
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+            stream=True,
+        )
+        received = []
+        counted = False
+        try:
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    received.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+                # Groq reports usage on the last chunk, under x_groq
+                usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None)
+                if usage is not None:
+                    record_tokens(model, usage.prompt_tokens, usage.completion_tokens)
+                    counted = True
+        finally:
+            response.close()
+            if not counted:
+                # Closed before the usage chunk (e.g. once the JSON was complete)
+                inc("llm_usage_estimated_total", model=model)
+                record_tokens(
+                    model,
+                    estimate_tokens("".join(str(m.get("content", "")) for m in messages)),
+                    estimate_tokens("".join(received)),
+                )
+
+
+class FakeBackend:
+    """
+    Offline stand-in for load tests: canned answers after `latency`
+    seconds, failing with a retryable error at `error_rate`.
+    """
+
+    QUESTIONS = [
+        "Tell me about a project you are proud of.",
+        "How do you approach debugging a production issue?",
+        "Describe a time you disagreed with a teammate.",
+        "How would you design a URL shortener?",
+        "What trade-offs did you make in your last project?",
+        "How do you keep your skills up to date?",
+        "Explain a technical concept to a non-technical person.",
+    ]
+
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def complete(self, model, messages, temperature, max_tokens, timeout) -> str:
+        with self._lock:
+            fail = self._random.random() < self.error_rate
+            sample = self._random.sample(self.QUESTIONS, 5)
+            score = self._random.randint(3, 9)
+        time.sleep(min(self.latency, timeout))
+        if self.latency > timeout:
+            raise TimeoutError("fake backend timed out")
+        if fail:
+            raise TransientLLMError("fake backend injected failure")
+
+        prompt = messages[-1]["content"]
+        feedback = "Clear answer. Add a concrete example and measurable impact."
+        if "JSON array" in prompt:
+            count = prompt.count("Candidate Answer:")
+            return json.dumps([
+                {"id": n, "score": score, "feedback": feedback} for n in range(count)
+            ])
+        if "JSON" in prompt:
+            return json.dumps({"score": score, "feedback": feedback})
+        return "\n".join(sample)
+
+    def stream(self, model, messages, temperature, max_tokens, timeout):
+        text = self.complete(model, messages, temperature, max_tokens, timeout)
+        for i in range(0, len(text), 4):
+            yield text[i:i + 4]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) when usage is not reported"""
+    return (len(text) + 3) // 4
+
+
+# ---------------- CLIENT ----------------
+def _status_code(exc):
+    return getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+
+
+def _retry_after(exc):
+    """Seconds from a Retry-After header, if the provider sent one"""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc) -> bool:
+    if isinstance(exc, (TransientLLMError, TimeoutError, ConnectionError)):
+        return True
+    if type(exc).__name__ in ("APITimeoutError", "APIConnectionError"):
+        return True
+    status = _status_code(exc)
+    return status is not None and (status in (408, 409, 429) or status >= 500)
+
+
+class LLMClient:
+    """
+    Wraps a backend with a shared rate limiter, circuit breaker,
+    per-call deadline and jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        backend,
+        limiter: TokenBucket = None,
+        breaker: CircuitBreaker = None,
+        deadline: float = LLM_DEADLINE,
+        attempt_timeout: float = LLM_ATTEMPT_TIMEOUT,
+        max_retries: int = LLM_MAX_RETRIES,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+    ):
+        self.backend = backend
+        self.limiter = limiter or TokenBucket(LLM_RATE, LLM_BURST)
+        self.breaker = breaker or CircuitBreaker()
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def _backoff(self, attempt: int, exc) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        retry_after = _retry_after(exc)
+        return max(delay, retry_after or 0)
+
+    def _admit(self, end: float) -> float:
+        """Pass the breaker and rate limiter; returns this attempt's timeout"""
+        admitted = self.breaker.allow()
+        if not admitted:
+            inc("llm_rejected_total", reason="circuit_open")
+            raise CircuitOpenError("LLM provider unavailable, try again shortly")
+
+        remaining = end - time.monotonic()
+        if remaining <= 0 or not self.limiter.acquire(timeout=remaining):
+            if admitted == "probe":
+                self.breaker.release()  # our probe must not stay taken forever
+            inc("llm_rejected_total", reason="deadline")
+            raise DeadlineExceeded("LLM call deadline exceeded")
+        return min(self.attempt_timeout, end - time.monotonic())
+
+    def _retry_or_raise(self, exc, attempt: int, end: float):
+        """Sleep before the next attempt, or re-raise if `exc` is final"""
+        if not is_retryable(exc):
+            self.breaker.record_success()  # provider is up; the request was bad
+            raise exc
+        self.breaker.record_failure()
+        if attempt >= self.max_retries:
+            raise exc
+        delay = self._backoff(attempt, exc)
+        if time.monotonic() + delay >= end:
+            raise DeadlineExceeded("LLM call deadline exceeded") from exc
+        inc("llm_retries_total", error=type(exc).__name__)
+        time.sleep(delay)
+
+    def complete(self, messages, model, temperature=0.3, max_tokens=400, deadline=None) -> str:
+        """Run one chat completion, retrying transient failures until the deadline"""
+        end = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            timeout = self._admit(end)
+            try:
+                text = self.backend.complete(model, messages, temperature, max_tokens, timeout)
+            except Exception as e:
+                self._retry_or_raise(e, attempt, end)
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            return text
+
+    def stream(self, messages, model, temperature=0.3, max_tokens=400, deadline=None):
+        """
+        Yield completion tokens as they arrive. Failures before the first
+        token are retried like complete(); closing the generator early
+        stops the provider stream.
+        """
+        end = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            timeout = self._admit(end)
+            started = False
+            tokens = self.backend.stream(model, messages, temperature, max_tokens, timeout)
+            try:
+                for token in tokens:
+                    started = True
+                    yield token
+            except GeneratorExit:
+                self.breaker.record_success()
+                raise
+            except Exception as e:
+                if started:
+                    self.breaker.record_failure()
+                    raise
+                self._retry_or_raise(e, attempt, end)
+                attempt += 1
+                continue
+            finally:
+                tokens.close()
+
+            self.breaker.record_success()
+            return
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client(api_key: str = None) -> LLMClient:
+    """Process-wide client, so every session shares one pool, limiter and breaker"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            if LLM_BACKEND == "fake":
+                backend = FakeBackend(
+                    latency=float(os.getenv("FAKE_LLM_LATENCY", "0.05")),
+                    error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+                )
+            else:
+                backend = GroqBackend(api_key)
+            _client = LLMClient(backend)
+        return _client
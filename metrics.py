@@ -0,0 +1,309 @@
+"""
+Lightweight latency and usage metrics.
+
+Stages are timed with the `instrument` decorator or the `timed` context
+manager into latency histograms; counters track LLM tokens, cache hits
+and errors. Snapshots are exported as Prometheus text or JSON, to a file
+every METRICS_INTERVAL seconds and/or over HTTP (/metrics, /metrics.json).
+
+Everything is off unless METRICS_ENABLED=1. When off, decorators return
+the function unchanged and the helpers return before taking any lock.
+"""
+import os
+import json
+import time
+import atexit
+import bisect
+import threading
+from functools import wraps
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+METRICS_FILE = os.getenv("METRICS_FILE", "")  # *.json → JSON, anything else → Prometheus text
+METRICS_INTERVAL = int(os.getenv("METRICS_INTERVAL", "15"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # 0: no HTTP endpoint
+
+# Seconds; covers a cache hit (ms) up to a slow OCR or LLM call
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+# ---------------- REGISTRY ----------------
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot: above the top bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding rank q"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[min(i, len(self.buckets) - 1)]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+class Registry:
+    """Counters and histograms keyed by name plus sorted labels"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}    # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> Histogram
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> dict:
+        """JSON-ready copy of every metric, with p50/p95/p99 estimates"""
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": h.count,
+                    "sum": h.sum,
+                    "p50": h.quantile(0.5),
+                    "p95": h.quantile(0.95),
+                    "p99": h.quantile(0.99),
+                }
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+        return {"timestamp": time.time(), "counters": counters, "histograms": histograms}
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{_labels(labels)} {value}")
+
+            for (name, labels), h in sorted(self._histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} histogram")
+                    typed.add(name)
+                cumulative = 0
+                for bound, n in zip(h.buckets, h.counts):
+                    cumulative += n
+                    lines.append(f"{name}_bucket{_labels(labels, le=bound)} {cumulative}")
+                lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {h.count}')
+                lines.append(f"{name}_sum{_labels(labels)} {h.sum}")
+                lines.append(f"{name}_count{_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+registry = Registry()
+
+
+# ---------------- RECORDING ----------------
+def inc(name, value=1, **labels):
+    """Add to a counter"""
+    if METRICS_ENABLED:
+        registry.inc(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    """Record one histogram sample"""
+    if METRICS_ENABLED:
+        registry.observe(name, value, **labels)
+
+
+def cache_result(cache: str, hit: bool):
+    """Count a cache lookup as a hit or a miss"""
+    if METRICS_ENABLED:
+        registry.inc("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+def record_tokens(model: str, prompt_tokens, completion_tokens):
+    """Token counts from an LLM response's `usage` field"""
+    if METRICS_ENABLED:
+        registry.inc("llm_tokens_total", prompt_tokens or 0, model=model, kind="prompt")
+        registry.inc("llm_tokens_total", completion_tokens or 0, model=model, kind="completion")
+
+
+@contextmanager
+def _timed(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        registry.inc("stage_errors_total", stage=stage)
+        raise
+    finally:
+        registry.observe("stage_seconds", time.perf_counter() - start, stage=stage)
+
+
+_NOOP = nullcontext()
+
+
+def timed(stage: str):
+    """Context manager: latency into stage_seconds, exceptions into stage_errors_total"""
+    return _timed(stage) if METRICS_ENABLED else _NOOP
+
+
+def instrument(stage: str):
+    """Decorator form of timed(); the function is returned as is when metrics are off"""
+    def decorate(func):
+        if not METRICS_ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _timed(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def timed_stream(stage: str, tokens):
+    """
+    Wrap a token generator: time to first token goes to
+    `<stage>_first_token`, the whole stream to `stage`.
+    """
+    return _timed_stream(stage, tokens) if METRICS_ENABLED else tokens
+
+
+def _timed_stream(stage, tokens):
+    start = time.perf_counter()
+    first = True
+    try:
+        with _timed(stage):
+            for token in tokens:
+                if first:
+                    registry.observe("stage_seconds", time.perf_counter() - start,
+                                     stage=f"{stage}_first_token")
+                    first = False
+                yield token
+    finally:
+        tokens.close()
+
+
+# ---------------- EXPORT ----------------
+def write_snapshot(path: str = METRICS_FILE):
+    """Write all metrics to path: JSON for *.json, Prometheus text otherwise"""
+    if path.endswith(".json"):
+        body = json.dumps(registry.snapshot(), indent=2)
+    else:
+        body = registry.prometheus()
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(body)
+    os.replace(tmp, path)
+
+
+def _export_forever(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            write_snapshot(path)
+        except OSError as e:
+            print("⚠️ Metrics export failed:", e)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] == "/metrics.json":
+            body, content_type = json.dumps(registry.snapshot()), "application/json"
+        elif self.path.split("?")[0] == "/metrics":
+            body, content_type = registry.prometheus(), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass  # keep scrapes out of the app log
+
+
+def start_http_server(port: int = METRICS_PORT, host: str = METRICS_HOST):
+    """Serve /metrics and /metrics.json from a daemon thread"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def start_exporters():
+    """
+    Start the exporters configured in the environment, once per process.
+    Called by the app, not on import, so OCR and report worker processes
+    never compete for the file or the port.
+    """
+    global _started
+    with _start_lock:
+        if _started or not METRICS_ENABLED:
+            return
+        _started = True
+
+    if METRICS_FILE:
+        threading.Thread(
+            target=_export_forever,
+            args=(METRICS_FILE, METRICS_INTERVAL),
+            name="metrics-export",
+            daemon=True,
+        ).start()
+        atexit.register(write_snapshot, METRICS_FILE)
+
+    if METRICS_PORT:
+        try:
+            start_http_server()
+        except OSError as e:
+            print("⚠️ Metrics endpoint failed:", e)
@@ -1,40 +1,329 @@
+import io
 import os
-from PIL import Image
-import pytesseract
-from pdfminer.high_level import extract_text
+import shutil
+import hashlib
+import tempfile
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 
-# Optional: OCR for scanned PDFs
-try:
-    from pdf2image import convert_from_path
-    POPPLER_AVAILABLE = True
-except ImportError:
-    POPPLER_AVAILABLE = False
+from cache_utils import resume_text_cache, sha256_bytes, sha256_file
+from metrics import instrument, cache_result
+
+# numpy, PIL, pytesseract, pdfminer and pdf2image are imported inside the
+# functions that use them, so importing this module stays cheap and the
+# app's first page renders before any of them are loaded.
 
 # Set tesseract path
-pytesseract.pytesseract.tesseract_cmd = r"D:\Tesseract-OCR\tesseract.exe"
+TESSERACT_CMD = os.getenv("TESSERACT_CMD", r"D:\Tesseract-OCR\tesseract.exe")
+
+# Scanned-PDF OCR settings (override via environment)
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 1)))
+
+# Image preprocessing before OCR (override via environment)
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "1") == "1"
+OCR_PSM = int(os.getenv("OCR_PSM", "3"))  # tesseract page segmentation mode
+PAGE_WIDTH_INCHES = 8.27                   # A4; used when a photo carries no usable DPI
+MIN_TRUSTED_DPI = 150                      # lower tags are camera defaults (72/96), not scans
+MAX_PAGE_INCHES = 17.0                     # a tag implying a wider page is not a document scan
+
+# Uploads streamed from anything but an in-memory buffer stay in memory
+# up to this size, then move to the session's spool directory
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(4 * 1024 * 1024)))
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None  # None: system temp dir
+
+# One pool per process, shared by every session, so concurrent uploads
+# never run more than OCR_WORKERS tesseract processes at once.
+# Workers are started from a clean process (forkserver/spawn), never
+# forked from the multi-threaded Streamlit server.
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+
+def get_ocr_pool():
+    """Return the shared OCR process pool, creating it on first use"""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _ocr_pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, mp_context=context)
+        return _ocr_pool
+
+
+def reset_ocr_pool(broken):
+    """Drop `broken` (a pool whose worker died) so the next caller gets a fresh one"""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is broken:
+            _ocr_pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache(maxsize=None)
+def get_tesseract():
+    """pytesseract, imported and pointed at TESSERACT_CMD on first use"""
+    import pytesseract
+    pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+    return pytesseract
+
+
+@lru_cache(maxsize=None)
+def poppler_available() -> bool:
+    """Whether pdf2image can be imported (optional: OCR for scanned PDFs)"""
+    try:
+        import pdf2image
+        return True
+    except ImportError:
+        return False
+
+
+# ---------------- UPLOADS ----------------
+class UploadSpool:
+    """
+    Scratch directory for one session's uploads. Large uploads and
+    scanned PDFs headed for the OCR pool are written here; the directory
+    is removed by cleanup(), when the object is garbage collected (its
+    session ends) or at interpreter exit.
+    """
+
+    def __init__(self, base_dir=UPLOAD_TMP_DIR):
+        self._dir = tempfile.TemporaryDirectory(prefix="upload_", dir=base_dir)
+
+    @property
+    def path(self):
+        return self._dir.name
+
+    def cleanup(self):
+        self._dir.cleanup()
+
+
+@contextmanager
+def open_upload(source, spool_dir=None):
+    """
+    Yield (seekable binary file, SHA-256) for an upload.
+    bytes and in-memory buffers (Streamlit's UploadedFile) are used as
+    they are, without a copy; any other stream is hashed while it is
+    copied into a SpooledTemporaryFile under spool_dir.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source), sha256_bytes(source)
+        return
+
+    if isinstance(source, io.BytesIO):
+        with source.getbuffer() as view:
+            key = sha256_bytes(view)
+        source.seek(0)
+        yield source, key
+        return
+
+    h = hashlib.sha256()
+    with tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES, dir=spool_dir) as spooled:
+        for block in iter(lambda: source.read(1 << 20), b""):
+            h.update(block)
+            spooled.write(block)
+        spooled.seek(0)
+        yield spooled, h.hexdigest()
+
+
+@contextmanager
+def spooled_path(stream, suffix, spool_dir=None):
+    """Copy a binary stream to a named file under spool_dir for tools that need a path"""
+    stream.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=suffix, dir=spool_dir, delete=False) as f:
+        shutil.copyfileobj(stream, f, 1 << 20)
+    try:
+        yield f.name
+    finally:
+        os.remove(f.name)
+
+
+# ---------------- PREPROCESSING ----------------
+def otsu_threshold(gray):
+    """Global threshold that best separates ink from paper (Otsu)"""
+    import numpy as np
+    hist = np.bincount(np.asarray(gray).ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_bg = np.cumsum(hist)
+    weight_fg = weight_bg[-1] - weight_bg
+    sum_bg = np.cumsum(hist * levels)
+    mean_bg = sum_bg / np.maximum(weight_bg, 1)
+    mean_fg = (sum_bg[-1] - sum_bg) / np.maximum(weight_fg, 1)
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between))
+
+
+def estimate_skew(binary, max_angle=5.0, step=0.5):
+    """
+    Skew angle in degrees by projection profile: text lines line up with
+    the rows when the row sums have the highest variance. An angle must
+    score strictly better than 0 to win, so blank pages stay unrotated.
+    """
+    import numpy as np
+    from PIL import ImageOps
+    small = binary.copy()
+    small.thumbnail((800, 800))
+    ink = ImageOps.invert(small)
+    low, high = ink.getextrema()
+    if low == high:
+        return 0.0  # uniform: rotating would only add fill corners
+
+    def score(angle):
+        rows = np.asarray(ink.rotate(angle, fillcolor=0)).sum(axis=1, dtype=np.float64)
+        return float(np.var(rows))
+
+    best_angle, best_score = 0.0, score(0.0)
+    for angle in np.arange(-max_angle, max_angle + step, step):
+        angle = float(angle)
+        if angle == 0.0:
+            continue
+        angle_score = score(angle)
+        if angle_score > best_score:
+            best_angle, best_score = angle, angle_score
+    return best_angle
 
 
-def extract_text_from_image(image_path):
-    """Extract text from an image (JPG/PNG) using pytesseract"""
+def _tagged_dpi(image):
+    """The image's DPI tag, or None when it cannot describe a scanned page"""
+    dpi = (image.info.get("dpi") or (0,))[0]
     try:
-        image = Image.open(image_path)
-        text = pytesseract.image_to_string(image)
+        dpi = float(dpi)
+    except (TypeError, ValueError):
+        return None
+    if dpi < MIN_TRUSTED_DPI or image.width / dpi > MAX_PAGE_INCHES:
+        return None
+    return dpi
+
+
+def preprocess_image(image, source_dpi=None, target_dpi=OCR_DPI,
+                     binarize=True, deskew=True, crop=True):
+    """
+    Prepare an image for tesseract: grayscale, rescale to target_dpi,
+    Otsu binarization, deskew and crop to the text. source_dpi falls back
+    to a plausible DPI tag, then to assuming it spans an A4 page width.
+    Images are only ever downscaled: upscaling adds pixels, not detail.
+    """
+    from PIL import Image, ImageOps
+    image = ImageOps.exif_transpose(image).convert("L")
+
+    dpi = source_dpi or _tagged_dpi(image) or image.width / PAGE_WIDTH_INCHES
+    scale = max(target_dpi / float(dpi), 0.25)
+    if scale < 0.9:
+        image = image.resize(
+            (max(1, int(image.width * scale)), max(1, int(image.height * scale))),
+            Image.LANCZOS,
+        )
+
+    if binarize or deskew or crop:
+        threshold = otsu_threshold(image)
+        binary = image.point(lambda v: 255 if v > threshold else 0)
+        if binarize:
+            image = binary
+
+        if deskew:
+            angle = estimate_skew(binary)
+            if angle:
+                image = image.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+                binary = binary.rotate(angle, expand=True, fillcolor=255)
+
+        if crop:
+            box = ImageOps.invert(binary).getbbox()
+            if box:
+                margin = 20
+                image = image.crop((
+                    max(0, box[0] - margin),
+                    max(0, box[1] - margin),
+                    min(image.width, box[2] + margin),
+                    min(image.height, box[3] + margin),
+                ))
+
+    return image
+
+
+def ocr_image(image, psm=OCR_PSM, preprocess=OCR_PREPROCESS, source_dpi=None):
+    """OCR a PIL image, optionally preprocessed, with the given page segmentation mode"""
+    if preprocess:
+        image = preprocess_image(image, source_dpi=source_dpi)
+    return get_tesseract().image_to_string(image, config=f"--psm {psm}")
+
+
+@instrument("ocr_image")
+def extract_text_from_image(image, psm=OCR_PSM, preprocess=OCR_PREPROCESS):
+    """Extract text from an image (JPG/PNG path or binary file) using pytesseract"""
+    from PIL import Image
+    try:
+        with Image.open(image) as image:
+            text = ocr_image(image, psm=psm, preprocess=preprocess)
         return text
     except Exception as e:
         print("❌ OCR failed for image:", e)
         return ""
 
 
-def extract_text_from_pdf(pdf_path):
+def ocr_pdf_page(pdf_path, page_number, dpi=OCR_DPI):
+    """Rasterize a single PDF page (1-based) and OCR it"""
+    from pdf2image import convert_from_path
+    pages = convert_from_path(
+        pdf_path, dpi=dpi, first_page=page_number, last_page=page_number
+    )
+    return ocr_image(pages[0], source_dpi=dpi) if pages else ""
+
+
+@instrument("ocr_pdf")
+def ocr_pdf(pdf_path, dpi=OCR_DPI, workers=OCR_WORKERS):
+    """
+    OCR a scanned PDF page by page.
+    Each page is rasterized on its own, so only one bitmap per worker
+    is alive at a time. With workers > 1 pages go to the shared pool of
+    OCR_WORKERS processes; text is always returned in page order.
     """
-    Extract text from PDF.
+    from pdf2image import pdfinfo_from_path
+
+    page_count = int(pdfinfo_from_path(pdf_path)["Pages"])
+    page_numbers = range(1, page_count + 1)
+
+    if workers <= 1 or page_count == 1:
+        text_pages = [ocr_pdf_page(pdf_path, n, dpi) for n in page_numbers]
+    else:
+        # A worker killed mid-page (e.g. out of memory) breaks the whole
+        # pool: replace it and try once more, then give up on this file
+        for attempt in range(2):
+            pool = get_ocr_pool()
+            try:
+                text_pages = list(pool.map(
+                    ocr_pdf_page,
+                    [pdf_path] * page_count,
+                    page_numbers,
+                    [dpi] * page_count,
+                ))
+                break
+            except BrokenProcessPool:
+                reset_ocr_pool(pool)
+                if attempt:
+                    raise
+                print("⚠️ OCR worker died; restarting the OCR pool")
+
+    return "\n".join(text_pages)
+
+
+@instrument("extract_pdf")
+def extract_text_from_pdf(pdf, dpi=OCR_DPI, workers=OCR_WORKERS, spool_dir=None):
+    """
+    Extract text from a PDF path or binary file.
     Uses pdfminer for text PDFs.
-    Falls back to OCR for scanned PDFs if poppler is available.
+    Falls back to page-parallel OCR for scanned PDFs if poppler is available;
+    a file is first written to spool_dir so the OCR workers can open it.
     """
+    from pdfminer.high_level import extract_text
+
     text = ""
     # First try pdfminer
     try:
-        text = extract_text(pdf_path)
+        text = extract_text(pdf)
         if text.strip():
             return text
     except Exception as e:
@@ -42,11 +331,13 @@ def extract_text_from_pdf(pdf_path):
         text = ""
 
     # If pdfminer gave nothing, try OCR (scanned PDF)
-    if POPPLER_AVAILABLE:
+    if poppler_available():
         try:
-            pages = convert_from_path(pdf_path, dpi=300)  # Will raise error if Poppler missing
-            text_pages = [pytesseract.image_to_string(page) for page in pages]
-            text = "\n".join(text_pages)
+            if isinstance(pdf, (str, os.PathLike)):
+                text = ocr_pdf(pdf, dpi=dpi, workers=workers)  # Will raise error if Poppler missing
+            else:
+                with spooled_path(pdf, ".pdf", spool_dir) as pdf_path:
+                    text = ocr_pdf(pdf_path, dpi=dpi, workers=workers)
         except Exception as e:
             print("❌ OCR for PDF failed:", e)
             text = ""
@@ -56,21 +347,63 @@ def extract_text_from_pdf(pdf_path):
     return text
 
 
-def extract_text_from_resume(file_path):
+SUPPORTED_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png")
+
+
+def extract_text_from_resume(source, name=None, spool=None):
     """
     Detect file type and extract text:
     - PDF → pdfminer / OCR
     - Image → OCR
+    `source` is a file path, bytes or a binary file object such as a
+    Streamlit upload; for the latter two `name` gives the file type.
+    Nothing is written to the working directory: temporary files go to
+    the `spool` UploadSpool (or the system temp dir) and are removed.
+    Results are cached on disk by SHA-256 of the file bytes.
     Returns empty string if unreadable
     """
-    file_path = str(file_path)
+    return read_resume(source, name, spool)[1]
 
-    if file_path.lower().endswith(".pdf"):
-        text = extract_text_from_pdf(file_path)
-    elif file_path.lower().endswith((".jpg", ".jpeg", ".png")):
-        text = extract_text_from_image(file_path)
+
+@instrument("read_resume")
+def read_resume(source, name=None, spool=None):
+    """
+    Like extract_text_from_resume, but returns (SHA-256 of the file, text,
+    whether the text came from the resume text cache) so callers can key
+    their own caches by document. The hash is None if the file is
+    unsupported or cannot be read.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        name = name or str(source)
+    kind = (name or "").lower()
+    if not kind.endswith(SUPPORTED_EXTENSIONS):
+        print("❌ Unsupported file type:", name)
+        return None, "", False
+
+    try:
+        if isinstance(source, (str, os.PathLike)):
+            key = sha256_file(source)
+            return (key, *_extract_cached(source, key, kind, spool))
+        with open_upload(source, spool.path if spool else None) as (stream, key):
+            return (key, *_extract_cached(stream, key, kind, spool))
+    except OSError as e:
+        print("❌ Cannot read file:", e)
+        return None, "", False
+
+
+def _extract_cached(source, key, kind, spool):
+    """(text, cache hit) for one resume"""
+    cached = resume_text_cache.get(key)
+    cache_result("resume_text", cached is not None)
+    if cached is not None:
+        return cached["text"], True
+
+    if kind.endswith(".pdf"):
+        text = extract_text_from_pdf(source, spool_dir=spool.path if spool else None)
     else:
-        print("❌ Unsupported file type:", file_path)
-        text = ""
+        text = extract_text_from_image(source)
 
-    return text
+    if text.strip():
+        resume_text_cache.set(key, {"text": text})
+
+    return text, False
@@ -1,121 +1,228 @@
+import io
+import json
+import hashlib
+import threading
+from collections import OrderedDict
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
-from textwrap import wrap
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from datetime import datetime
 
+from metrics import instrument, cache_result
+
+# Rendered reports by hash of their inputs, so re-clicks don't re-render
+REPORT_CACHE_SIZE = 32
+_report_cache = OrderedDict()
+_report_cache_lock = threading.Lock()
+
+
+# ---------------- LAYOUT ----------------
+_width_cache = {}
+
+
+def _word_width(word, font, size):
+    key = (word, font, size)
+    width = _width_cache.get(key)
+    if width is None:
+        if len(_width_cache) > 50_000:
+            _width_cache.clear()
+        width = _width_cache[key] = stringWidth(word, font, size)
+    return width
+
+
+def wrap_text(text, font, size, max_width):
+    """
+    Greedy word wrap by measured string width. Newlines in the text
+    start new lines; words wider than a line are split by character.
+    """
+    space = _word_width(" ", font, size)
+    lines = []
+    for paragraph in str(text).split("\n"):
+        line, line_width = [], 0.0
+        for word in paragraph.split():
+            w = _word_width(word, font, size)
+            while w > max_width:  # a single very long word (e.g. a URL)
+                lo, hi = 1, len(word)  # longest prefix that fits
+                while lo < hi:
+                    mid = (lo + hi + 1) // 2
+                    if stringWidth(word[:mid], font, size) <= max_width:
+                        lo = mid
+                    else:
+                        hi = mid - 1
+                cut = lo
+                if line:
+                    lines.append(" ".join(line))
+                    line, line_width = [], 0.0
+                lines.append(word[:cut])
+                word = word[cut:]
+                w = _word_width(word, font, size)
+            if line and line_width + space + w > max_width:
+                lines.append(" ".join(line))
+                line, line_width = [], 0.0
+            line_width += (space if line else 0) + w
+            line.append(word)
+        lines.append(" ".join(line))
+    return lines
+
+
+class TextLayout:
+    """
+    Top-down flow layout on a canvas. Every line checks the remaining
+    space, so page breaks happen between lines rather than only between
+    blocks, and each page gets the footer.
+    """
+
+    def __init__(self, c, left, right, top, bottom=60):
+        self.c = c
+        self.left = left
+        self.right = right
+        self.top = top
+        self.bottom = bottom
+        self.y = top
+        self.page = 1
+
+    def footer(self):
+        self.c.setFont("Helvetica-Oblique", 9)
+        self.c.drawString(self.left, 30, "Generated by AI Interview Coach")
+        self.c.drawRightString(self.right, 30, f"Page {self.page}")
+
+    def new_page(self):
+        self.footer()
+        self.c.showPage()
+        self.page += 1
+        self.y = self.top
+
+    def ensure(self, height):
+        """Start a new page unless `height` points still fit"""
+        if self.y - height < self.bottom:
+            self.new_page()
+
+    def gap(self, height):
+        self.y -= height
+
+    def line(self, text, font, size, leading, x=None):
+        self.ensure(leading)
+        self.c.setFont(font, size)
+        self.c.drawString(self.left if x is None else x, self.y, text)
+        self.y -= leading
+
+    def paragraph(self, text, font, size, leading):
+        for line in wrap_text(text, font, size, self.right - self.left):
+            self.line(line, font, size, leading)
+
+    def rule(self):
+        self.ensure(1)
+        self.c.line(self.left, self.y, self.right, self.y)
+
+
+@instrument("render_pdf")
+def render_pdf(role, round_type, questions, answers, feedbacks, scores, avg_score, cache=True):
+    """
+    Render the report in memory and return the PDF bytes.
+    cache=False skips the report cache, for one-off reports such as batch exports.
+    """
+    report_date = datetime.now().strftime("%d %B %Y")
+    if not cache:
+        buffer = io.BytesIO()
+        _draw_report(buffer, role, round_type, questions, answers, feedbacks, scores, avg_score, report_date)
+        return buffer.getvalue()
+
+    key = hashlib.sha256(json.dumps(
+        [role, round_type, questions, answers, feedbacks, scores, avg_score, report_date],
+        default=str
+    ).encode()).hexdigest()
+
+    with _report_cache_lock:
+        hit = key in _report_cache
+        if hit:
+            _report_cache.move_to_end(key)
+            data = _report_cache[key]
+    cache_result("report_pdf", hit)
+    if hit:
+        return data
+
+    buffer = io.BytesIO()
+    _draw_report(buffer, role, round_type, questions, answers, feedbacks, scores, avg_score, report_date)
+    data = buffer.getvalue()
+
+    with _report_cache_lock:
+        _report_cache[key] = data
+        if len(_report_cache) > REPORT_CACHE_SIZE:
+            _report_cache.popitem(last=False)
+    return data
+
+
+@instrument("generate_pdf")
+def generate_pdf(role, round_type, questions, answers, feedbacks, scores, avg_score,
+                 file_name="Interview_Report.pdf"):
+    """Render the report and write it to file_name; returns the path"""
+    data = render_pdf(role, round_type, questions, answers, feedbacks, scores, avg_score)
+    with open(file_name, "wb") as f:
+        f.write(data)
+    return file_name
 
-def draw_wrapped_text(c, text, x, y, max_chars, line_height):
-    lines = wrap(text, max_chars)
-    for line in lines:
-        c.drawString(x, y, line)
-        y -= line_height
-    return y
-
-
-def generate_pdf(role, round_type, questions, answers, feedbacks, scores, avg_score):
 
-    # -------- Only first 5 questions --------
-    questions = questions[:5]
-    answers = answers[:5]
-    feedbacks = feedbacks[:5]
-    scores = scores[:5]
+def _draw_report(output, role, round_type, questions, answers, feedbacks, scores, avg_score, report_date):
 
-    file_name = "Interview_Report.pdf"
-    c = canvas.Canvas(file_name, pagesize=A4)
+    c = canvas.Canvas(output, pagesize=A4)
     width, height = A4
 
     left = 50
     right = width - 50
-    y = height - 60
+    layout = TextLayout(c, left, right, top=height - 60)
 
     # ---------------- HEADER ----------------
-    c.setFont("Helvetica-Bold", 22)
-    c.drawString(left, y, "AI Interview Coach Report")
-    y -= 28
-
-    c.setFont("Helvetica", 12)
-    c.drawString(left, y, "Interview Performance Evaluation")
-    y -= 30
-
-    c.line(left, y, right, y)
-    y -= 25
+    layout.line("AI Interview Coach Report", "Helvetica-Bold", 22, 28)
+    layout.line("Interview Performance Evaluation", "Helvetica", 12, 30)
+    layout.rule()
+    layout.gap(25)
 
     # ---------------- SUMMARY ----------------
+    y = layout.y
     c.setFont("Helvetica-Bold", 12)
     c.drawString(left, y, "Role:")
-    c.setFont("Helvetica", 12)
-    c.drawString(left + 60, y, role)
-
-    c.setFont("Helvetica-Bold", 12)
     c.drawString(left + 300, y, "Round:")
-    c.setFont("Helvetica", 12)
-    c.drawString(left + 360, y, round_type)
-    y -= 20
+    c.drawString(left, y - 20, "Date:")
+    c.drawString(left + 300, y - 20, "Average Score:")
+    c.drawString(left, y - 40, f"Total Questions: {len(questions)}")
 
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(left, y, "Date:")
     c.setFont("Helvetica", 12)
-    c.drawString(left + 60, y, datetime.now().strftime("%d %B %Y"))
-
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(left + 300, y, "Average Score:")
-    c.setFont("Helvetica", 12)
-    c.drawString(left + 410, y, f"{avg_score} / 10")
-    y -= 20
-
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(left, y, "Total Questions: 5")
-    y -= 30
+    c.drawString(left + 60, y, role)
+    c.drawString(left + 360, y, round_type)
+    c.drawString(left + 60, y - 20, report_date)
+    c.drawString(left + 410, y - 20, f"{avg_score} / 10")
+    layout.gap(70)
 
-    c.line(left, y, right, y)
-    y -= 30
+    layout.rule()
+    layout.gap(30)
 
     # ---------------- QUESTIONS ----------------
-    for i in range(5):
-
-        if y < 140:
-            c.showPage()
-            y = height - 60
-
-        # Question
-        c.setFont("Helvetica-Bold", 13)
-        c.drawString(left, y, f"Question {i+1}")
-        y -= 18
+    for i, question in enumerate(questions):
 
-        c.setFont("Helvetica", 11)
-        y = draw_wrapped_text(c, questions[i], left, y, 95, 14)
-        y -= 12
+        # Keep each heading on the same page as its first line of text
+        layout.ensure(18 + 14)
+        layout.line(f"Question {i+1}", "Helvetica-Bold", 13, 18)
+        layout.paragraph(question, "Helvetica", 11, 14)
+        layout.gap(12)
 
-        # Answer
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(left, y, "Your Answer:")
-        y -= 16
+        layout.ensure(16 + 13)
+        layout.line("Your Answer:", "Helvetica-Bold", 12, 16)
+        layout.paragraph(answers[i] if i < len(answers) else "", "Helvetica", 10, 13)
+        layout.gap(12)
 
-        c.setFont("Helvetica", 10)
-        y = draw_wrapped_text(c, answers[i], left, y, 100, 13)
-        y -= 12
+        layout.ensure(16 + 13)
+        layout.line("AI Feedback:", "Helvetica-Bold", 12, 16)
+        layout.paragraph(feedbacks[i] if i < len(feedbacks) else "", "Helvetica", 10, 13)
+        layout.gap(12)
 
-        # Feedback
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(left, y, "AI Feedback:")
-        y -= 16
+        score = scores[i] if i < len(scores) else 0
+        layout.line(f"Score: {score} / 10", "Helvetica-Bold", 12, 25)
 
-        c.setFont("Helvetica", 10)
-        y = draw_wrapped_text(c, feedbacks[i], left, y, 100, 13)
-        y -= 12
-
-        # Score
-        c.setFont("Helvetica-Bold", 12)
-        c.drawString(left, y, f"Score: {scores[i]} / 10")
-        y -= 25
-
-        c.line(left, y, right, y)
-        y -= 25
+        layout.rule()
+        layout.gap(25)
 
     # ---------------- FOOTER ----------------
-    c.setFont("Helvetica-Oblique", 9)
-    c.drawString(left, 30, "Generated by AI Interview Coach")
+    layout.footer()
 
     c.save()
-    return file_name
@@ -0,0 +1,233 @@
+"""
+Offline question bank: questions tagged by role, round type and
+difficulty, served without any LLM call.
+
+Build or extend it with the bulk generation job:
+
+    python question_bank.py build --roles "Engineer,Data Scientist" --per-difficulty 10
+"""
+import os
+import re
+import gzip
+import json
+import random
+import argparse
+import threading
+from difflib import SequenceMatcher
+from collections import defaultdict
+
+QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH", "question_bank.json.gz")
+ROLE_MATCH_THRESHOLD = float(os.getenv("ROLE_MATCH_THRESHOLD", "0.85"))
+ROUND_TYPES = ["Technical", "Behavioral", "HR"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+# Seniority and filler words: they don't change which questions fit a role
+_GENERIC_TOKENS = frozenset("""
+senior sr junior jr lead principal staff head chief associate intern trainee
+entry level mid i ii iii iv the of and for in
+""".split())
+
+
+def role_tokens(role: str):
+    return frozenset(_WORD_RE.findall(role.lower()))
+
+
+def distinctive_tokens(role: str):
+    return role_tokens(role) - _GENERIC_TOKENS
+
+
+def token_similarity(a: str, b: str) -> float:
+    """1.0 for equal tokens; short tokens (qa, ml, ios) must match exactly"""
+    if a == b:
+        return 1.0
+    if min(len(a), len(b)) < 4:
+        return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _covers(tokens, others, threshold):
+    """Per-token best similarity if every token has a close match in `others`, else None"""
+    scores = []
+    for token in tokens:
+        best = max((token_similarity(token, other) for other in others), default=0.0)
+        if best < threshold:
+            return None
+        scores.append(best)
+    return scores
+
+
+class QuestionBank:
+    """
+    Compact store: a role list plus [text, role id, round, difficulty]
+    rows, gzip-compressed JSON on disk. Lookups go through an inverted
+    index (role token -> role ids) and a (role id, round) -> rows index.
+    """
+
+    def __init__(self, path: str = QUESTION_BANK_PATH):
+        self.path = path
+        self.roles = []
+        self.rows = []
+        self._role_ids = {}
+        self._token_index = defaultdict(set)
+        self._by_role_round = defaultdict(list)
+        self._by_round = defaultdict(list)
+        self._seen = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self.load()
+
+    # ---------------- STORAGE ----------------
+    def load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        for text, role_id, round_type, difficulty in data["questions"]:
+            self.add(text, data["roles"][role_id], round_type, difficulty)
+
+    def save(self):
+        data = {"roles": self.roles, "questions": self.rows}
+        tmp = f"{self.path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def add(self, text: str, role: str, round_type: str, difficulty: str = "medium") -> bool:
+        """Add one question; False if it is already in the bank"""
+        role = " ".join(role.split())
+        key = (text.strip().lower(), role.lower(), round_type)
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+
+            role_id = self._role_ids.get(role.lower())
+            if role_id is None:
+                role_id = self._role_ids[role.lower()] = len(self.roles)
+                self.roles.append(role)
+                for token in role_tokens(role):
+                    self._token_index[token].add(role_id)
+
+            self._by_role_round[(role_id, round_type)].append(len(self.rows))
+            self._by_round[round_type].append(len(self.rows))
+            self.rows.append([text.strip(), role_id, round_type, difficulty])
+        return True
+
+    # ---------------- LOOKUP ----------------
+    def match_role(self, role: str):
+        """
+        Id of the closest known role, or None if nothing is close enough.
+        Every distinctive token (seniority words aside) must pair up with
+        one in the known role and the other way round, allowing typos of
+        ROLE_MATCH_THRESHOLD similarity per token. So "Sr Sofware Engineer"
+        finds "Software Engineer", but "Data Engineer" does not match
+        "Engineer" and "Backend Developer" does not match "Frontend Developer".
+        """
+        role = " ".join(role.split()).lower()
+        if role in self._role_ids:
+            return self._role_ids[role]
+
+        tokens = distinctive_tokens(role)
+        if not tokens:
+            return None
+        candidates = set()
+        for token in tokens:
+            candidates |= self._token_index.get(token, set())
+
+        best, best_score = None, 0.0
+        for role_id in candidates:
+            known = distinctive_tokens(self.roles[role_id])
+            forward = _covers(tokens, known, ROLE_MATCH_THRESHOLD)
+            backward = forward and _covers(known, tokens, ROLE_MATCH_THRESHOLD)
+            if not backward:
+                continue
+            score = sum(forward + backward) / (len(forward) + len(backward))
+            if score > best_score:
+                best, best_score = role_id, score
+        return best
+
+    def lookup(self, role: str, round_type: str, k: int = 5, difficulty: str = None):
+        """k random questions for the role and round, or None if the bank has too few"""
+        role_id = self.match_role(role)
+        if role_id is None:
+            return None
+        rows = [self.rows[i] for i in self._by_role_round.get((role_id, round_type), [])]
+        if difficulty:
+            rows = [r for r in rows if r[3] == difficulty]
+        if len(rows) < k:
+            return None
+        return [r[0] for r in random.sample(rows, k)]
+
+    def lookup_any_role(self, round_type: str, k: int = 5):
+        """Generic questions for a round from any role (provider-outage fallback)"""
+        ids = self._by_round.get(round_type, [])
+        return [self.rows[i][0] for i in random.sample(ids, k)] if len(ids) >= k else None
+
+
+_bank = None
+_bank_lock = threading.Lock()
+
+
+def get_bank() -> QuestionBank:
+    """Process-wide bank, loaded from disk on first use"""
+    global _bank
+    with _bank_lock:
+        if _bank is None:
+            _bank = QuestionBank()
+        return _bank
+
+
+# ---------------- BULK GENERATION JOB ----------------
+def build(roles, rounds, per_difficulty, path, workers):
+    """Fill the bank with LLM-generated questions for every role/round/difficulty"""
+    from concurrent.futures import ThreadPoolExecutor
+    from backend import call_groq, split_questions
+    from dedup_utils import dedupe_questions
+
+    bank = QuestionBank(path)
+    jobs = [(r, t, d) for r in roles for t in rounds for d in DIFFICULTIES]
+
+    def generate(job):
+        role, round_type, difficulty = job
+        prompt = f"""
+Generate exactly {per_difficulty} {difficulty} {round_type} interview questions
+for the role of {role}.
+Rules:
+- One question per line
+- No numbering
+- No explanations
+"""
+        return job, dedupe_questions(split_questions(call_groq(prompt, max_tokens=60 * per_difficulty)))
+
+    added = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for (role, round_type, difficulty), questions in pool.map(generate, jobs):
+            added += sum(bank.add(q, role, round_type, difficulty) for q in questions)
+            print(f"{role} / {round_type} / {difficulty}: {len(questions)} questions")
+
+    bank.save()
+    print(f"Added {added} questions; bank now holds {len(bank.rows)} in {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline interview question bank")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="generate questions with the LLM and store them")
+    b.add_argument("--roles", required=True, help="comma-separated job roles")
+    b.add_argument("--rounds", default=",".join(ROUND_TYPES))
+    b.add_argument("--per-difficulty", type=int, default=10)
+    b.add_argument("--workers", type=int, default=3)
+    b.add_argument("--path", default=QUESTION_BANK_PATH)
+    args = parser.parse_args()
+
+    build(
+        [r.strip() for r in args.roles.split(",") if r.strip()],
+        [r.strip() for r in args.rounds.split(",") if r.strip()],
+        args.per_difficulty,
+        args.path,
+        args.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
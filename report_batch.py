@@ -0,0 +1,105 @@
+"""
+Bulk export of interview reports for a cohort.
+
+Renders PDFs on a process pool and streams them into one ZIP archive:
+
+    python report_batch.py --out cohort.zip --workers 4
+"""
+import os
+import re
+import sys
+import time
+import zipfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from pdf_utils import render_pdf
+
+_UNSAFE_NAME_RE = re.compile(r"[^\w.-]")
+
+
+def safe_name(name: str) -> str:
+    """Archive-safe file name: no path separators, no leading dots"""
+    return _UNSAFE_NAME_RE.sub("_", name).lstrip(".") or "candidate"
+
+
+def _render_record(record):
+    """Worker: one interview record -> (archive name, PDF bytes)"""
+    scores = record["scores"]
+    avg_score = round(sum(scores) / len(scores), 2) if scores else 0
+    # Every report is unique: a per-worker cache would only hold memory
+    data = render_pdf(
+        record["role"],
+        record["round_type"],
+        record["questions"],
+        record["answers"],
+        record["feedbacks"],
+        scores,
+        avg_score,
+        cache=False,
+    )
+    username = safe_name(str(record.get("username") or "candidate"))
+    return f"{username}_{record['interview_id']}.pdf", data
+
+
+def export_reports_zip(records, zip_path, workers=None, progress=None):
+    """
+    Render every record in `records` (any iterable) into `zip_path`.
+    At most 2 × workers reports are in flight, so neither the records
+    nor the PDFs are ever all held in memory at once.
+    progress(done, elapsed_seconds) is called after each report.
+    Returns (reports written, reports per second).
+    """
+    workers = workers or os.cpu_count() or 1
+    records = iter(records)
+    done = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        in_flight = set()
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < 2 * workers:
+                record = next(records, None)
+                if record is None:
+                    exhausted = True
+                else:
+                    in_flight.add(pool.submit(_render_record, record))
+            if not in_flight:
+                break
+
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, data = future.result()
+                archive.writestr(name, data)
+                done += 1
+                if progress is not None:
+                    progress(done, time.perf_counter() - start)
+
+    elapsed = time.perf_counter() - start
+    return done, (done / elapsed if elapsed else 0.0)
+
+
+def _print_progress(done, elapsed):
+    rate = done / elapsed if elapsed else 0.0
+    print(f"\r{done} reports, {rate:.1f} reports/s", end="", file=sys.stderr, flush=True)
+
+
+def main():
+    from session_store import iter_finished_interviews
+
+    parser = argparse.ArgumentParser(description="Export interview reports as one ZIP")
+    parser.add_argument("--out", required=True, help="ZIP file to write")
+    parser.add_argument("--user", help="only this username's interviews")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    count, rate = export_reports_zip(
+        iter_finished_interviews(args.user), args.out, args.workers, _print_progress
+    )
+    print(f"\nWrote {count} reports to {args.out} ({rate:.1f} reports/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import re
+import heapq
+import unicodedata
+
+# Headings we recognise, mapped to a canonical section name
+SECTION_ALIASES = {
+    "experience": ["experience", "work experience", "professional experience",
+                   "employment", "employment history", "work history", "internships",
+                   "internship"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects"],
+    "skills": ["skills", "technical skills", "core skills", "key skills",
+               "technologies", "tech stack", "tools"],
+    "education": ["education", "academic background", "qualifications"],
+    "summary": ["summary", "profile", "about me", "objective", "career objective"],
+    "certifications": ["certifications", "certificates", "courses"],
+    "achievements": ["achievements", "awards", "accomplishments"],
+}
+_HEADINGS = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+# How much a section is worth asking about, relative to the rest
+SECTION_WEIGHTS = {
+    "projects": 1.4,
+    "experience": 1.3,
+    "skills": 1.2,
+    "achievements": 1.1,
+    "certifications": 0.9,
+    "education": 0.8,
+    "summary": 0.8,
+}
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9+#.]*")
+_HEADING_STRIP = " \t:-–—•*#|"
+_HYPHEN_BREAK_RE = re.compile(r"([a-z])-\n\s*([a-z])")
+_BULLET_RE = re.compile(r"^[•●▪■◦‣∙·➢►*]\s*")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Clean extracted resume text before chunking: Unicode NFKC (ligatures,
+    full-width and non-breaking characters), words hyphenated across a
+    line break rejoined, bullets turned into "- ", control characters
+    dropped, runs of spaces collapsed and blank lines squeezed.
+    """
+    text = unicodedata.normalize("NFKC", text).replace("\f", "\n")
+    text = _HYPHEN_BREAK_RE.sub(r"\1\2", text)
+
+    lines = []
+    for raw in text.splitlines():
+        line = "".join(ch for ch in raw if ch.isprintable() or ch == "\t")
+        line = _SPACE_RE.sub(" ", line).strip()
+        line = _BULLET_RE.sub("- ", line)
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def count_tokens(text: str) -> int:
+    """Rough LLM token count: words and punctuation marks"""
+    return len(_TOKEN_RE.findall(text))
+
+
+def detect_heading(line: str):
+    """Canonical section name if the line is a section heading, else None"""
+    cleaned = line.strip(_HEADING_STRIP).lower()
+    if not cleaned or len(cleaned) > 40:
+        return None
+    return _HEADINGS.get(cleaned)
+
+
+def _split_long_line(line, max_tokens):
+    words = line.split()
+    piece, size = [], 0
+    for word in words:
+        n = count_tokens(word)
+        if piece and size + n > max_tokens:
+            yield " ".join(piece), size
+            piece, size = [], 0
+        piece.append(word)
+        size += n
+    if piece:
+        yield " ".join(piece), size
+
+
+def iter_chunks(lines, max_tokens: int = 256, overlap: int = 32):
+    """
+    Pack resume lines into chunks of at most max_tokens, never crossing
+    a section boundary. Consecutive chunks of one section share up to
+    `overlap` tokens. `lines` may be a string or any iterable of lines,
+    so large documents are processed in one streaming pass.
+    Yields {"section", "text", "tokens"} dicts.
+    """
+    if isinstance(lines, str):
+        lines = lines.splitlines()
+
+    section = "general"
+    body, size = [], 0  # (line, tokens) pairs of the chunk being built
+
+    def flush():
+        return {
+            "section": section,
+            "text": f"{section.title()}:\n" + "\n".join(line for line, _ in body),
+            "tokens": size,
+        }
+
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+
+        heading = detect_heading(line)
+        if heading:
+            if body:
+                yield flush()
+            section, body, size = heading, [], 0
+            continue
+
+        for piece, n in _split_long_line(line, max_tokens):
+            if body and size + n > max_tokens:
+                yield flush()
+                # carry the tail of this chunk into the next one
+                tail, tail_size = [], 0
+                for prev, m in reversed(body):
+                    if tail_size + m > overlap or tail_size + m + n > max_tokens:
+                        break
+                    tail.insert(0, (prev, m))
+                    tail_size += m
+                body, size = tail, tail_size
+            body.append((piece, n))
+            size += n
+
+    if body:
+        yield flush()
+
+
+def density(chunk: dict) -> float:
+    """
+    Information density: share of distinct words, boosted by numbers
+    (metrics, dates), capitalised terms (tools, companies) and the
+    section weight.
+    """
+    words = _WORD_RE.findall(chunk["text"])
+    if not words:
+        return 0.0
+    distinct = len({w.lower() for w in words}) / len(words)
+    numbers = sum(ch.isdigit() for ch in chunk["text"]) / max(1, len(chunk["text"]))
+    proper = sum(w[0].isupper() for w in words) / len(words)
+    size = min(1.0, chunk["tokens"] / 64)  # very short chunks say little
+    score = distinct * (1 + 4 * numbers + proper) * size
+    return score * SECTION_WEIGHTS.get(chunk["section"], 1.0)
+
+
+def select_chunks(text, k: int = 3, max_tokens: int = 256, overlap: int = 32):
+    """
+    The k most useful chunks, returned in document order. The densest
+    chunk of each section is preferred, so the picks cover different
+    sections before taking a second chunk from any one of them.
+    """
+    per_section = {}  # section -> (score, index, chunk)
+    top = []          # min-heap of the k densest overall
+    for i, chunk in enumerate(iter_chunks(text, max_tokens, overlap)):
+        item = (density(chunk), -i, chunk)
+        if item[:2] > per_section.get(chunk["section"], (-1.0, 0))[:2]:
+            per_section[chunk["section"]] = item
+        if len(top) < k:
+            heapq.heappush(top, item[:2] + (i, chunk))
+        elif item[:2] > top[0][:2]:
+            heapq.heapreplace(top, item[:2] + (i, chunk))
+
+    picked = sorted(per_section.values(), key=lambda item: item[:2], reverse=True)[:k]
+    chosen = {-index for _, index, _ in picked}
+    for score, index, i, chunk in sorted(top, reverse=True, key=lambda item: item[:2]):
+        if len(picked) >= k:
+            break
+        if i not in chosen:
+            picked.append((score, index, chunk))
+            chosen.add(i)
+
+    return [chunk["text"] for _, _, chunk in sorted(picked, key=lambda item: -item[1])]
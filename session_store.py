@@ -0,0 +1,102 @@
+import time
+
+from db import get_pool
+
+# ---------------- SQL ----------------
+INSERT_INTERVIEW = """
+    INSERT INTO interviews (user_id, role, round_type, updated)
+    SELECT id, ?, ?, ? FROM users WHERE username = ?
+"""
+INSERT_ITEM = "INSERT INTO interview_items (interview_id, idx, question) VALUES (?, ?, ?)"
+UPDATE_ANSWER = "UPDATE interview_items SET answer = ? WHERE interview_id = ? AND idx = ?"
+UPDATE_SCORE = "UPDATE interview_items SET score = ?, feedback = ? WHERE interview_id = ? AND idx = ?"
+UPDATE_PROGRESS = "UPDATE interviews SET current_q = ?, completed = ?, updated = ? WHERE id = ?"
+SELECT_ACTIVE = """
+    SELECT i.id, i.role, i.round_type, i.current_q, i.completed
+    FROM interviews i JOIN users u ON u.id = i.user_id
+    WHERE u.username = ? AND (i.completed = 0 OR EXISTS (
+        SELECT 1 FROM interview_items t
+        WHERE t.interview_id = i.id AND t.answer != '' AND t.score IS NULL
+    ))
+    ORDER BY i.updated DESC LIMIT 1
+"""
+SELECT_INTERVIEW = "SELECT id, role, round_type, current_q, completed FROM interviews WHERE id = ?"
+SELECT_FINISHED = """
+    SELECT i.id, u.username FROM interviews i JOIN users u ON u.id = i.user_id
+    WHERE i.completed = 1 AND (? IS NULL OR u.username = ?)
+    ORDER BY i.id
+"""
+SELECT_ITEMS = """
+    SELECT question, answer, score, feedback FROM interview_items
+    WHERE interview_id = ? ORDER BY idx
+"""
+
+
+def start_interview(username, role, round_type, questions):
+    """Persist a new interview and its questions; returns its id (None if no such user)"""
+    with get_pool().connection() as conn:
+        cur = conn.execute(INSERT_INTERVIEW, (role, round_type, time.time(), username))
+        if cur.rowcount == 0:
+            return None
+        interview_id = cur.lastrowid
+        conn.executemany(
+            INSERT_ITEM, [(interview_id, i, q) for i, q in enumerate(questions)]
+        )
+    return interview_id
+
+
+def save_answer(interview_id, idx, answer, current_q, completed):
+    """Save one answer and the progress it caused, in one transaction"""
+    with get_pool().connection() as conn:
+        conn.execute(UPDATE_ANSWER, (answer, interview_id, idx))
+        conn.execute(UPDATE_PROGRESS, (current_q, int(completed), time.time(), interview_id))
+
+
+def save_score(interview_id, idx, score, feedback):
+    with get_pool().connection() as conn:
+        conn.execute(UPDATE_SCORE, (score, feedback, interview_id, idx))
+
+
+def _load(conn, row):
+    interview_id, role, round_type, current_q, completed = row
+    items = conn.execute(SELECT_ITEMS, (interview_id,)).fetchall()
+    return {
+        "interview_id": interview_id,
+        "role": role,
+        "round_type": round_type,
+        "current_q": current_q,
+        "completed": bool(completed),
+        "questions": [q for q, _, _, _ in items],
+        "answers": [a for _, a, _, _ in items],
+        "scores": [s if s is not None else 0 for _, _, s, _ in items],
+        "feedbacks": [f for _, _, _, f in items],
+        # answered but never scored (e.g. the worker restarted mid-job)
+        "unscored": [i for i, (_, a, s, _) in enumerate(items) if a and s is None],
+    }
+
+
+def load_active_interview(username):
+    """The user's most recent unfinished (or not fully scored) interview, or None"""
+    with get_pool().connection() as conn:
+        row = conn.execute(SELECT_ACTIVE, (username,)).fetchone()
+        return _load(conn, row) if row else None
+
+
+def load_interview(interview_id):
+    with get_pool().connection() as conn:
+        row = conn.execute(SELECT_INTERVIEW, (interview_id,)).fetchone()
+        return _load(conn, row) if row else None
+
+
+def iter_finished_interviews(username=None):
+    """
+    Yield every completed interview (optionally one user's) with its
+    username, loading one interview at a time.
+    """
+    with get_pool().connection() as conn:
+        ids = conn.execute(SELECT_FINISHED, (username, username)).fetchall()
+    for interview_id, owner in ids:
+        record = load_interview(interview_id)
+        if record is not None:
+            record["username"] = owner
+            yield record
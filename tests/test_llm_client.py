@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_client import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    FakeBackend,
+    LLMClient,
+    TokenBucket,
+)
+
+MESSAGES = [{"role": "user", "content": "questions please"}]
+
+
+class HalfOpenProbeTest(unittest.TestCase):
+    def test_probe_rejected_by_rate_limiter_is_released(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        limiter = TokenBucket(rate=20, capacity=1)
+        client = LLMClient(FakeBackend(latency=0), limiter=limiter, breaker=breaker)
+
+        breaker.record_failure()
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, "half-open")
+
+        # Drain the bucket so the probe is turned away by the limiter
+        self.assertTrue(limiter.acquire(timeout=0))
+        with self.assertRaises(DeadlineExceeded):
+            client.complete(MESSAGES, model="m", deadline=0.001)
+
+        # Tokens are back: the next call must be allowed to probe and close the breaker
+        time.sleep(0.1)
+        self.assertTrue(client.complete(MESSAGES, model="m"))
+        self.assertEqual(breaker.state, "closed")
+
+    def test_rejected_call_keeps_another_threads_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        probes = []
+
+        class TrippingLimiter:
+            """While this call waits, the breaker trips and another caller takes the probe"""
+            def acquire(self, timeout=None):
+                breaker.record_failure()
+                probes.append(breaker.allow())
+                return False
+
+        client = LLMClient(FakeBackend(latency=0), limiter=TrippingLimiter(), breaker=breaker)
+        with self.assertRaises(DeadlineExceeded):
+            client.complete(MESSAGES, model="m", deadline=1)
+
+        self.assertEqual(probes, ["probe"])
+        self.assertFalse(breaker.allow())
+
+    def test_only_one_probe_while_half_open(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        client = LLMClient(FakeBackend(latency=0), breaker=breaker)
+        with self.assertRaises(CircuitOpenError):
+            client.complete(MESSAGES, model="m")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the caches created on import out of the working tree
+_scratch = tempfile.TemporaryDirectory(prefix="test_scoring_")
+os.environ.setdefault("CACHE_DIR", _scratch.name)
+os.environ.setdefault("LLM_BACKEND", "fake")
+
+import backend
+from json_utils import extract_json
+
+PAIRS = [("What is a closure?", "A function with its scope."), ("Why index?", "Faster reads.")]
+
+
+class ScoreGroupTest(unittest.TestCase):
+    def score_group(self, reply):
+        single = mock.Mock(return_value={"score": 0, "feedback": "single"})
+        with mock.patch.object(backend, "call_groq", return_value=reply), \
+                mock.patch.object(backend, "get_scores", single):
+            return backend._score_group(PAIRS), single
+
+    def test_echoed_index_before_array_is_skipped(self):
+        reply = (
+            '[0]\n[{"id": 0, "score": 7, "feedback": "Good."}, '
+            '{"id": 1, "score": 4, "feedback": "Thin."}]'
+        )
+        results, single = self.score_group(reply)
+        self.assertEqual([r["score"] for r in results], [7, 4])
+        single.assert_not_called()
+
+    def test_bad_item_falls_back_alone(self):
+        reply = '[{"id": 0, "score": null}, {"id": 1, "score": 6, "feedback": "Fine."}]'
+        results, single = self.score_group(reply)
+        self.assertEqual([r["score"] for r in results], [0, 6])
+        single.assert_called_once_with(*PAIRS[0])
+
+
+class ExtractJSONTest(unittest.TestCase):
+    def test_accept_skips_values_and_keeps_scanning(self):
+        text = 'Scores for [0] and [1]: [{"score": 5}]'
+        self.assertEqual(extract_json(text, "["), [0])
+        self.assertEqual(
+            extract_json(text, "[", lambda v: all(isinstance(i, dict) for i in v)),
+            [{"score": 5}],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()